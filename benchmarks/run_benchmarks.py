@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Бенчмарки анализатора и генераторов на синтетических репозиториях
+
+Для каждого сценария генерируется (или берется из рабочей директории) синтетический
+репозиторий, и в отдельном процессе замеряются время анализа, время генерации конфигураций,
+пиковая память процесса и число обращений к файловой системе во время анализа.
+Результаты сравниваются с сохраненной базовой линией; при регрессии код возврата 1.
+
+Примеры:
+    python benchmarks/run_benchmarks.py --scale small --save-baseline
+    python benchmarks/run_benchmarks.py --scale small
+    python benchmarks/run_benchmarks.py --files 250000 --scenario node-modules --repeat 1
+"""
+
+import argparse
+import builtins
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Добавляем путь к src для импорта модулей
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.synthetic import KINDS, ensure_repository
+from src.analyzers import RepositoryAnalyzer
+from src.generators import GitLabGenerator, JenkinsGenerator, DockerfileGenerator, GenerationPipeline
+from src.utils.profiling import enable_profiling
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# Сценарий -> (вид синтетического репозитория, анализ как монорепозитория)
+SCENARIOS = {
+    "python": ("python", False),
+    "node-modules": ("node-modules", False),
+    "polyglot-monorepo": ("polyglot-monorepo", True),
+}
+
+# Масштабы: число файлов в репозитории
+SCALES = {
+    "small": 10_000,
+    "medium": 100_000,
+    "large": 1_000_000,
+}
+
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+DEFAULT_WORKDIR = Path(tempfile.gettempdir()) / "self-deploy-bench"
+
+# Допустимый относительный рост метрик против базовой линии: время и память шумят,
+# счетчики обращений к файловой системе детерминированы
+DEFAULT_TOLERANCE = 0.25
+COUNT_TOLERANCE = 0.02
+# Рост времени меньше этого (секунды) не считается регрессией даже при большом относительном росте
+MIN_TIME_DELTA = 0.05
+
+# Метрики, зависящие от машины: сравниваются, только если базовая линия записана в том же окружении
+MACHINE_METRICS = frozenset({"analysis_seconds", "generation_seconds", "peak_rss_mb"})
+# Поля окружения, определяющие сравнимость времени и памяти
+ENVIRONMENT_KEYS = ("python", "platform", "machine", "cpu_count")
+
+# Метрика -> допуск (None - общий допуск --tolerance)
+CHECKED_METRICS = {
+    "analysis_seconds": None,
+    "generation_seconds": None,
+    "peak_rss_mb": None,
+    "fs_calls": COUNT_TOLERANCE,
+    "files_read": COUNT_TOLERANCE,
+    "bytes_read": COUNT_TOLERANCE,
+}
+
+# Функции, вызовы которых считаются обращениями к файловой системе
+_FS_FUNCTIONS = [(os, "scandir"), (os, "listdir"), (os, "stat"), (os, "lstat"), (builtins, "open"), (io, "open")]
+
+
+class _FsCallCounter:
+    """Подменяет функции файловой системы обертками со счетчиком вызовов на время замера"""
+
+    def __init__(self):
+        self.calls: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._originals = []
+
+    def __enter__(self):
+        for module, name in _FS_FUNCTIONS:
+            original = getattr(module, name)
+            self._originals.append((module, name, original))
+            setattr(module, name, self._wrap(name, original))
+        return self
+
+    def __exit__(self, *exc_info):
+        for module, name, original in reversed(self._originals):
+            setattr(module, name, original)
+        self._originals.clear()
+
+    def _wrap(self, name: str, original):
+        def counted(*args, **kwargs):
+            with self._lock:
+                self.calls[name] = self.calls.get(name, 0) + 1
+            return original(*args, **kwargs)
+        return counted
+
+
+def run_case(scenario: str, repo_path: str, repeat: int) -> Dict[str, Any]:
+    """Замеры одного сценария; выполняется в отдельном процессе, чтобы пиковая память была его собственной"""
+    _, monorepo = SCENARIOS[scenario]
+    analyzer = RepositoryAnalyzer()
+    pipeline = GenerationPipeline([GitLabGenerator(), JenkinsGenerator(), DockerfileGenerator()])
+
+    analysis_times, generation_times = [], []
+    fs_calls: Dict[str, int] = {}
+    counters: Dict[str, int] = {}
+    languages: List[str] = []
+    for run in range(repeat):
+        profiler = enable_profiling()
+        with _FsCallCounter() as fs_counter:
+            started = time.perf_counter()
+            if monorepo:
+                analyses = analyzer.analyze_local_monorepo(repo_path)
+            else:
+                analyses = [analyzer.analyze_local_project(repo_path)]
+            analysis_times.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        for analysis in analyses:
+            pipeline.render_all(analysis, "")
+        generation_times.append(time.perf_counter() - started)
+
+        if run == 0:
+            # Обращения к файловой системе и чтения детерминированы - достаточно первого прогона
+            fs_calls = dict(fs_counter.calls)
+            for phase in profiler.summary():
+                for counter, value in phase["counters"].items():
+                    counters[counter] = counters.get(counter, 0) + value
+            languages = sorted(f"{analysis.component_path or '.'}:{analysis.language}/{analysis.framework}"
+                               for analysis in analyses)
+
+    return {
+        "analysis_seconds": statistics.median(analysis_times),
+        "generation_seconds": statistics.median(generation_times),
+        "peak_rss_mb": _peak_rss_mb(),
+        "fs_calls": sum(fs_calls.values()),
+        "fs_calls_by_function": fs_calls,
+        "files_walked": counters.get("files_walked", 0),
+        "files_read": counters.get("files_read", 0),
+        "bytes_read": counters.get("bytes_read", 0),
+        "components": languages,
+    }
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux возвращает килобайты, macOS - байты
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def compare_with_baseline(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+                          tolerance: float, same_environment: bool = True) -> List[str]:
+    """Возвращает описания регрессий относительно базовой линии
+
+    В другом окружении сравниваются только детерминированные метрики: обращения к файловой
+    системе, чтения и результат анализа.
+    """
+    regressions = []
+    for key, metrics in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        if metrics["components"] != reference.get("components"):
+            regressions.append(f"{key}: результат анализа изменился: {reference.get('components')} -> "
+                               f"{metrics['components']}")
+        for metric, metric_tolerance in CHECKED_METRICS.items():
+            if metric in MACHINE_METRICS and not same_environment:
+                continue
+            current, previous = metrics.get(metric), reference.get(metric)
+            if current is None or previous is None:
+                continue
+            limit = previous * (1 + (tolerance if metric_tolerance is None else metric_tolerance))
+            if metric.endswith("_seconds") and current - previous < MIN_TIME_DELTA:
+                continue
+            if current > limit:
+                regressions.append(f"{key}: {metric} {_format_value(previous)} -> {_format_value(current)} "
+                                   f"(+{(current / previous - 1) * 100 if previous else 100:.0f}%)")
+    return regressions
+
+
+def _format_value(value: Any) -> str:
+    return f"{value:.3f}" if isinstance(value, float) else str(value)
+
+
+def print_results(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]]):
+    """Печатает таблицу замеров; в скобках - изменение против базовой линии"""
+    columns = [("analysis_seconds", "анализ, с"), ("generation_seconds", "генерация, с"),
+               ("peak_rss_mb", "RSS, МБ"), ("fs_calls", "вызовы ФС"), ("files_read", "чтения"),
+               ("bytes_read", "байт прочитано")]
+    rows = [["сценарий"] + [title for _, title in columns]]
+    for key, metrics in results.items():
+        reference = baseline.get(key, {})
+        row = [key]
+        for metric, _ in columns:
+            value = metrics.get(metric)
+            cell = "-" if value is None else _format_value(value)
+            previous = reference.get(metric)
+            if value is not None and previous:
+                cell += f" ({(value / previous - 1) * 100:+.0f}%)"
+            row.append(cell)
+        rows.append(row)
+
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    for n, row in enumerate(rows):
+        print("  ".join(cell.ljust(width) for cell, width in zip(row, widths)))
+        if n == 0:
+            print("  ".join("-" * width for width in widths))
+
+
+def load_baseline(path: Path) -> Dict[str, Any]:
+    if not path.is_file():
+        return {"cases": {}}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(path: Path, baseline: Dict[str, Any], results: Dict[str, Dict[str, Any]], meta: Dict[str, Any]):
+    """Записывает замеры в базовую линию; сценарии других масштабов сохраняются"""
+    baseline.setdefault("cases", {}).update(results)
+    baseline["meta"] = meta
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def _environment() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Бенчмарки анализа и генерации на синтетических репозиториях",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="\n".join(f"  {name}: {description}" for name, (_, description) in KINDS.items())
+    )
+    size = parser.add_mutually_exclusive_group()
+    size.add_argument("--scale", choices=sorted(SCALES, key=SCALES.get), default="small",
+                      help="Масштаб репозиториев (small - 10k, medium - 100k, large - 1M файлов)")
+    size.add_argument("--files", type=int, help="Точное число файлов в репозиториях")
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS),
+                        help="Сценарий (можно указать несколько раз; по умолчанию все)")
+    parser.add_argument("--repeat", type=int, default=3, help="Прогонов на сценарий, берется медиана (по умолчанию 3)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed генерации репозиториев")
+    parser.add_argument("--workdir", default=str(DEFAULT_WORKDIR),
+                        help=f"Директория синтетических репозиториев (по умолчанию {DEFAULT_WORKDIR})")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="Файл базовой линии")
+    parser.add_argument("--save-baseline", action="store_true", help="Записать замеры как базовую линию")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help=f"Допустимый рост времени и памяти (по умолчанию {DEFAULT_TOLERANCE:.0%})")
+    parser.add_argument("--results", help="Сохранить замеры в JSON")
+    args = parser.parse_args()
+
+    if args.repeat < 1:
+        parser.error("--repeat должен быть не меньше 1")
+    files = args.files if args.files is not None else SCALES[args.scale]
+    scenarios = args.scenario or list(SCENARIOS)
+
+    baseline_path = Path(args.baseline)
+    baseline = load_baseline(baseline_path)
+    baseline_cases = baseline.get("cases", {})
+    meta = _environment()
+    baseline_meta = baseline.get("meta", {})
+    same_environment = all(baseline_meta.get(key) == meta[key] for key in ENVIRONMENT_KEYS)
+    if baseline_cases and not same_environment:
+        print("Базовая линия записана в другом окружении: время и память не проверяются, "
+              "только обращения к файловой системе, чтения и результат анализа")
+
+    results = {}
+    for scenario in scenarios:
+        kind, _ = SCENARIOS[scenario]
+        started = time.perf_counter()
+        repo_path = ensure_repository(args.workdir, kind, files, args.seed)
+        print(f"{scenario}: репозиторий {repo_path} ({time.perf_counter() - started:.1f} с на подготовку)")
+        # Свежий процесс на сценарий: пиковая память и кеши не переносятся между сценариями
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+            results[f"{scenario}@{files}"] = executor.submit(run_case, scenario, str(repo_path), args.repeat).result()
+
+    print()
+    print_results(results, baseline_cases)
+
+    if args.results:
+        with open(args.results, "w", encoding="utf-8") as f:
+            json.dump({"meta": meta, "cases": results}, f, ensure_ascii=False, indent=2)
+
+    if args.save_baseline:
+        save_baseline(baseline_path, baseline, results, meta)
+        print(f"\nБазовая линия сохранена: {baseline_path}")
+        return 0
+
+    regressions = compare_with_baseline(results, baseline_cases, args.tolerance, same_environment)
+    if regressions:
+        print("\nРегрессии относительно базовой линии:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    if not any(key in baseline_cases for key in results):
+        print(f"\nБазовой линии для этих сценариев нет: запустите с --save-baseline ({baseline_path})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+"""
+Генерация синтетических репозиториев для бенчмарков
+
+Репозиторий полностью определяется видом, числом файлов и seed: повторная генерация
+дает то же дерево с тем же содержимым, поэтому замеры разных прогонов сравнимы.
+"""
+
+import json
+import os
+import random
+import shutil
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+# Версия формата генерации: при изменении раскладки или содержимого сгенерированные
+# ранее репозитории пересоздаются, а базовую линию нужно записать заново
+GENERATOR_VERSION = 1
+
+# Файлов в одной директории и ветвление дерева директорий
+FILES_PER_DIR = 50
+DIR_FANOUT = 10
+
+# Глубина цепочки вложенных node_modules (pkg/node_modules/pkg/...)
+NODE_MODULES_DEPTH = 8
+
+# Доля файлов вида в node_modules и в тестах
+NODE_MODULES_SHARE = 0.9
+TEST_SHARE = 0.1
+
+# Вид -> (функция раскладки, описание)
+KINDS: Dict[str, Tuple[Callable[["_TreeWriter", int], None], str]] = {}
+
+
+def _kind(name: str, description: str):
+    def register(layout):
+        KINDS[name] = (layout, description)
+        return layout
+    return register
+
+
+class _TreeWriter:
+    """Пишет файлы дерева и детерминированно дополняет их строками-заполнителями"""
+
+    def __init__(self, root: Path, seed: int):
+        self.root = root
+        self.rng = random.Random(seed)
+
+    def write(self, rel_path: str, content: str, padding: bool = False):
+        path = self.root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if padding:
+            # Разный размер файлов - чтобы чтения детекторов были похожи на реальные
+            content += "".join(f"// line {n}\n" if rel_path.endswith((".js", ".jsx", ".go", ".java"))
+                               else f"# line {n}\n" for n in range(self.rng.randint(0, 60)))
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+
+    def spread(self, base: str, count: int, name: Callable[[int], str], content: Callable[[int], str]):
+        """Раскладывает count файлов по дереву директорий под base"""
+        for i in range(count):
+            self.write(f"{base}/{_spread_dir(i)}{name(i)}" if base else f"{_spread_dir(i)}{name(i)}",
+                       content(i), padding=True)
+
+    def node_modules(self, base: str, count: int):
+        """Зависимости npm: пакеты с цепочками вложенных node_modules глубиной NODE_MODULES_DEPTH"""
+        prefix = f"{base}/node_modules" if base else "node_modules"
+        written = 0
+        package = 0
+        while written < count:
+            chain = prefix
+            for depth in range(NODE_MODULES_DEPTH):
+                if written >= count:
+                    break
+                chain = f"{chain}/pkg-{package}-{depth}"
+                self.write(f"{chain}/package.json", json.dumps({"name": f"pkg-{package}-{depth}"}))
+                batch = min(FILES_PER_DIR - 1, count - written - 1)
+                for i in range(batch):
+                    self.write(f"{chain}/lib/file{i}.js", f"module.exports = {i};\n")
+                written += batch + 1
+                chain = f"{chain}/node_modules"
+            package += 1
+
+
+def _spread_dir(i: int) -> str:
+    """Директория i-го файла: FILES_PER_DIR файлов на директорию, DIR_FANOUT поддиректорий"""
+    k = i // FILES_PER_DIR
+    parts = []
+    while k:
+        k, digit = divmod(k, DIR_FANOUT)
+        parts.append(f"m{digit}")
+    return "".join(f"{part}/" for part in reversed(parts))
+
+
+def _split(files: int, shares: List[float]) -> List[int]:
+    """Делит число файлов по долям; остаток достается последней части"""
+    counts = [int(files * share) for share in shares[:-1]]
+    return counts + [max(0, files - sum(counts))]
+
+
+def _python_component(tree: _TreeWriter, base: str, files: int, framework: str = "fastapi"):
+    prefix = f"{base}/" if base else ""
+    tree.write(f"{prefix}pyproject.toml",
+               f'[project]\nname = "synthetic"\nversion = "1.0.0"\ndependencies = ["{framework}", "pytest"]\n')
+    tree.write(f"{prefix}requirements.txt", f"{framework}\npytest\n")
+    tree.write(f"{prefix}app.py", f"from {framework} import *\n\napp = None\n")
+    sources, tests = _split(max(0, files - 3), [1 - TEST_SHARE, TEST_SHARE])
+    tree.spread(f"{prefix}app", sources, lambda i: f"module_{i}.py",
+                lambda i: f'"""Module {i}"""\n\nimport os\n\n\ndef handler_{i}():\n    return {i}\n')
+    tree.spread(f"{prefix}tests", tests, lambda i: f"test_module_{i}.py",
+                lambda i: f"def test_handler_{i}():\n    assert True\n")
+
+
+def _javascript_component(tree: _TreeWriter, base: str, files: int, framework: str = "express",
+                          node_modules_share: float = NODE_MODULES_SHARE):
+    prefix = f"{base}/" if base else ""
+    tree.write(f"{prefix}package.json", json.dumps({
+        "name": "synthetic",
+        "version": "1.0.0",
+        "scripts": {"build": "node build.js", "test": "jest"},
+        "dependencies": {framework: "*"},
+        "devDependencies": {"jest": "*"},
+    }, indent=2))
+    tree.write(f"{prefix}package-lock.json", json.dumps({"name": "synthetic", "lockfileVersion": 3}))
+    tree.write(f"{prefix}src/index.js", f"const lib = require('{framework}');\nmodule.exports = lib;\n")
+    dependencies, sources, tests = _split(max(0, files - 3), [node_modules_share,
+                                                               (1 - node_modules_share) * (1 - TEST_SHARE),
+                                                               (1 - node_modules_share) * TEST_SHARE])
+    tree.node_modules(base, dependencies)
+    tree.spread(f"{prefix}src/lib", sources, lambda i: f"module{i}.js",
+                lambda i: f"export function handler{i}() {{\n  return {i};\n}}\n")
+    tree.spread(f"{prefix}__tests__", tests, lambda i: f"module{i}.test.js",
+                lambda i: f"test('handler{i}', () => {{}});\n")
+
+
+def _go_component(tree: _TreeWriter, base: str, files: int):
+    prefix = f"{base}/" if base else ""
+    tree.write(f"{prefix}go.mod", "module example.com/synthetic\n\ngo 1.21\n\n"
+                                  "require github.com/gin-gonic/gin v1.9.1\n")
+    tree.write(f"{prefix}main.go", 'package main\n\nimport "github.com/gin-gonic/gin"\n\n'
+                                   "func main() {\n\tgin.Default()\n}\n")
+    sources, tests = _split(max(0, files - 2), [1 - TEST_SHARE, TEST_SHARE])
+    tree.spread(f"{prefix}internal", sources, lambda i: f"handler{i}.go",
+                lambda i: f"package internal\n\nfunc Handler{i}() int {{\n\treturn {i}\n}}\n")
+    tree.spread(f"{prefix}internal", tests, lambda i: f"handler{i}_test.go",
+                lambda i: f'package internal\n\nimport "testing"\n\nfunc TestHandler{i}(t *testing.T) {{}}\n')
+
+
+def _java_component(tree: _TreeWriter, base: str, files: int):
+    prefix = f"{base}/" if base else ""
+    package_dir = "com/example/synthetic"
+    tree.write(f"{prefix}pom.xml",
+               "<project>\n  <modelVersion>4.0.0</modelVersion>\n  <groupId>com.example</groupId>\n"
+               "  <artifactId>synthetic</artifactId>\n  <version>1.0.0</version>\n"
+               "  <parent>\n    <groupId>org.springframework.boot</groupId>\n"
+               "    <artifactId>spring-boot-starter-parent</artifactId>\n  </parent>\n</project>\n")
+    tree.write(f"{prefix}src/main/java/{package_dir}/SyntheticApplication.java",
+               "package com.example.synthetic;\n\n"
+               "import org.springframework.boot.autoconfigure.SpringBootApplication;\n\n"
+               "@SpringBootApplication\npublic class SyntheticApplication {}\n")
+    sources, tests = _split(max(0, files - 2), [1 - TEST_SHARE, TEST_SHARE])
+    tree.spread(f"{prefix}src/main/java/{package_dir}", sources, lambda i: f"Service{i}.java",
+                lambda i: f"package com.example.synthetic;\n\npublic class Service{i} {{}}\n")
+    tree.spread(f"{prefix}src/test/java/{package_dir}", tests, lambda i: f"Service{i}Test.java",
+                lambda i: f"package com.example.synthetic;\n\npublic class Service{i}Test {{}}\n")
+
+
+@_kind("python", "Python-проект (FastAPI) с пакетом модулей и тестами")
+def _python_layout(tree: _TreeWriter, files: int):
+    tree.write(".gitignore", "*.log\n.venv/\n")
+    _python_component(tree, "", files - 1)
+
+
+@_kind("node-modules", "JavaScript-проект, 90% файлов которого - глубоко вложенные node_modules")
+def _node_modules_layout(tree: _TreeWriter, files: int):
+    tree.write(".gitignore", "node_modules/\ncoverage/\n")
+    _javascript_component(tree, "", files - 1)
+
+
+@_kind("polyglot-monorepo", "Монорепозиторий: Go, Java, React с node_modules и Python")
+def _polyglot_layout(tree: _TreeWriter, files: int):
+    tree.write("README.md", "# Synthetic monorepo\n")
+    go_files, java_files, web_files, python_files = _split(files - 1, [0.25, 0.25, 0.25, 0.25])
+    _go_component(tree, "services/gateway", go_files)
+    _java_component(tree, "services/billing", java_files)
+    _javascript_component(tree, "web", web_files, framework="react", node_modules_share=0.5)
+    _python_component(tree, "ml/scoring", python_files, framework="flask")
+
+
+def ensure_repository(workdir: str, kind: str, files: int, seed: int = 0) -> Path:
+    """Возвращает путь синтетического репозитория, генерируя его при отсутствии
+
+    Рядом с репозиторием хранится манифест параметров генерации; репозиторий с другим
+    манифестом (например, от прошлой версии генератора) пересоздается.
+    """
+    if kind not in KINDS:
+        raise ValueError(f"Неизвестный вид репозитория: {kind}")
+    if files < 10:
+        raise ValueError("Синтетический репозиторий должен содержать хотя бы 10 файлов")
+
+    root = Path(workdir) / f"{kind}-{files}-{seed}"
+    manifest_path = root.with_suffix(".json")
+    manifest = {"kind": kind, "files": files, "seed": seed, "version": GENERATOR_VERSION}
+    if root.is_dir() and manifest_path.is_file():
+        try:
+            if json.loads(manifest_path.read_text(encoding="utf-8")) == manifest:
+                return root
+        except ValueError:
+            pass
+
+    shutil.rmtree(root, ignore_errors=True)
+    tmp_root = root.with_name(root.name + ".tmp")
+    shutil.rmtree(tmp_root, ignore_errors=True)
+    layout, _ = KINDS[kind]
+    tree = _TreeWriter(tmp_root, seed)
+    layout(tree, files)
+    os.replace(tmp_root, root)
+    manifest_path.write_text(json.dumps(manifest), encoding="utf-8")
+    return root
@@ -5,22 +5,54 @@ Self-Deploy CI/CD - Автоматическая генерация CI/CD кон
 """
 
 import argparse
+import asyncio
 import sys
 import os
+import time
 from pathlib import Path
 
 # Добавляем путь к src для импорта модулей
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
-from src.analyzers import RepositoryAnalyzer
-from src.generators import JenkinsGenerator, GitLabGenerator
+from src.analyzers import RepositoryAnalyzer, AnalysisCache, MirrorPool
+from src.analyzers.file_index import DEFAULT_IGNORED_DIRS
+from src.generators import JenkinsGenerator, GitLabGenerator, DockerfileGenerator, GenerationPipeline
+from src.batch import BatchRunner, ParallelBatchRunner, read_repos_file
+from src.server import AnalysisServer, DEFAULT_HOST, DEFAULT_PORT
 from src.utils.reporting import (
+    print_batch_summary,
     print_summary,
     print_error_summary,
     print_success_message,
     print_technology_detection,
-    print_configuration_preview
+    print_configuration_preview,
+    print_profile
 )
+from src.utils.profiling import enable_profiling
+
+
+def parse_test_shards(value: str):
+    """Разбирает значение --test-shards: auto или положительное число"""
+    if value == 'auto':
+        return value
+    try:
+        shards = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"ожидается число или auto: {value}")
+    if shards < 1:
+        raise argparse.ArgumentTypeError(f"число шардов должно быть положительным: {value}")
+    return shards
+
+
+def parse_megabytes(value: str) -> int:
+    """Разбирает ограничение размера в МБ: положительное число"""
+    try:
+        megabytes = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"ожидается число мегабайт: {value}")
+    if megabytes < 1:
+        raise argparse.ArgumentTypeError(f"размер должен быть положительным: {value}")
+    return megabytes
 
 
 def parse_arguments():
@@ -33,15 +65,69 @@ def parse_arguments():
   python main.py --repo https://github.com/user/java-project --system jenkins
   python main.py --repo https://gitlab.com/user/python-app --system gitlab --output ./ci-config
   python main.py --repo git@github.com:user/go-service.git --system jenkins --verbose
+  python main.py --repos-file repos.txt --system both --output ./ci-configs
+  python main.py --serve --system both --jobs 4
         """
     )
     
-    parser.add_argument(
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument(
         '--repo', 
-        required=True,
         help='URL Git-репозитория для анализа'
     )
     
+    source.add_argument(
+        '--repos-file',
+        help='Файл со списком репозиториев для пакетной обработки (URL на строку или JSONL)'
+    )
+    
+    source.add_argument(
+        '--serve',
+        action='store_true',
+        help='Запустить локальный HTTP-сервис анализа и генерации (POST /analyze, POST /generate)'
+    )
+    
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=1,
+        help='Число параллельных обработчиков в пакетном режиме и одновременных анализов сервиса (по умолчанию: 1)'
+    )
+    
+    parser.add_argument(
+        '--host',
+        default=DEFAULT_HOST,
+        help=f'Локальный адрес сервиса (по умолчанию: {DEFAULT_HOST})'
+    )
+    
+    parser.add_argument(
+        '--port',
+        type=int,
+        default=DEFAULT_PORT,
+        help=f'Порт сервиса (по умолчанию: {DEFAULT_PORT})'
+    )
+    
+    parser.add_argument(
+        '--max-pending',
+        type=int,
+        default=16,
+        help='Число ожидающих анализов в очереди сервиса, сверх него запросы отклоняются с 503 (по умолчанию: 16)'
+    )
+    
+    parser.add_argument(
+        '--timeout',
+        type=float,
+        default=None,
+        help='Ограничение времени на клонирование и анализ одного репозитория, в секундах'
+    )
+    
+    parser.add_argument(
+        '--max-temp-mb',
+        type=parse_megabytes,
+        default=None,
+        help='Ограничение суммарного размера клонов на диске в пакетном режиме, МБ'
+    )
+    
     parser.add_argument(
         '--system',
         choices=['jenkins', 'gitlab', 'both'],
@@ -61,6 +147,86 @@ def parse_arguments():
         help='Подробный вывод'
     )
     
+    parser.add_argument(
+        '--ignore-dir',
+        action='append',
+        default=[],
+        metavar='NAME',
+        help='Дополнительная директория, пропускаемая при анализе (можно указать несколько раз)'
+    )
+    
+    parser.add_argument(
+        '--no-gitignore',
+        action='store_true',
+        help='Не учитывать .gitignore при обходе репозитория'
+    )
+    
+    parser.add_argument(
+        '--clone-mode',
+        choices=['full', 'sparse', 'tree'],
+        default='full',
+        help='Режим клонирования: full - shallow clone, sparse - partial clone только манифестов и выборки исходников, '
+             'tree - bare clone, анализ прямо из git-объектов без рабочей копии'
+    )
+    
+    parser.add_argument(
+        '--mirror-dir',
+        default=None,
+        help='Директория локальных зеркал репозиториев: повторный анализ стоит git fetch изменений вместо полного клона'
+    )
+    
+    parser.add_argument(
+        '--mirror-max-mb',
+        type=parse_megabytes,
+        default=10240,
+        help='Ограничение суммарного размера зеркал, МБ; давно не использованные удаляются (по умолчанию: 10240)'
+    )
+    
+    parser.add_argument(
+        '--parallel-detectors',
+        action='store_true',
+        help='Запускать детекторы языков параллельно над общим индексом файлов'
+    )
+    
+    parser.add_argument(
+        '--test-shards',
+        type=parse_test_shards,
+        default=None,
+        metavar='N|auto',
+        help='Разбить модульные тесты на N параллельных шардов (auto - по числу найденных тестовых файлов)'
+    )
+    
+    parser.add_argument(
+        '--dockerfile',
+        action='store_true',
+        help='Дополнительно сгенерировать многоэтапный Dockerfile под стек проекта'
+    )
+    
+    parser.add_argument(
+        '--monorepo',
+        action='store_true',
+        help='Монорепозиторий: отдельный анализ и конфигурация для каждого компонента'
+    )
+    
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Замерить время фаз (клонирование, детекторы, обход файлов, рендер, валидация, запись): '
+             'таблица в консоли и profile.json в выходной директории'
+    )
+    
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Не использовать кеш результатов анализа (всегда клонировать и анализировать заново)'
+    )
+    
+    parser.add_argument(
+        '--cache-dir',
+        default=None,
+        help='Директория кеша результатов анализа (по умолчанию: ~/.cache/self-deploy/analysis)'
+    )
+    
     return parser.parse_args()
 
 
@@ -68,9 +234,24 @@ def validate_arguments(args):
     """Валидирует аргументы командной строки"""
     from src.utils.git_utils import validate_git_url
     
-    if not validate_git_url(args.repo):
+    if args.repo and not validate_git_url(args.repo):
         raise ValueError(f"Некорректный URL Git-репозитория: {args.repo}")
     
+    if args.jobs < 1:
+        raise ValueError(f"Число обработчиков должно быть положительным: {args.jobs}")
+    
+    if args.monorepo and not args.repo:
+        raise ValueError("Режим --monorepo поддерживается только для одного репозитория (--repo)")
+    
+    if args.profile and args.serve:
+        raise ValueError("Режим --profile не поддерживается для сервиса")
+    
+    if args.max_pending < 1:
+        raise ValueError(f"Размер очереди сервиса должен быть положительным: {args.max_pending}")
+    
+    if args.repos_file and not Path(args.repos_file).is_file():
+        raise ValueError(f"Файл со списком репозиториев не найден: {args.repos_file}")
+    
     # Создаем выходную директорию если не существует
     output_dir = Path(args.output)
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -78,21 +259,88 @@ def validate_arguments(args):
     return True
 
 
-def get_generators(system: str):
+def get_generators(system: str, test_shards=None, dockerfile: bool = False):
     """Возвращает соответствующие генераторы для выбранной CI/CD системы"""
     if system == 'jenkins':
-        return [JenkinsGenerator()]
+        generators = [JenkinsGenerator(test_shards)]
     elif system == 'gitlab':
-        return [GitLabGenerator()]
+        generators = [GitLabGenerator(test_shards)]
     elif system == 'both':
-        return [JenkinsGenerator(), GitLabGenerator()]
+        generators = [JenkinsGenerator(test_shards), GitLabGenerator(test_shards)]
     else:
         raise ValueError(f"Неподдерживаемая CI/CD система: {system}")
+    
+    if dockerfile:
+        generators.append(DockerfileGenerator())
+    return generators
+
+
+def run_batch(args, analyzer, generators):
+    """Пакетный режим: один анализатор и один набор генераторов на все репозитории"""
+    entries = read_repos_file(args.repos_file)
+    print(f"\n🚀 ПАКЕТНАЯ ОБРАБОТКА: {len(entries)} репозиториев")
+    
+    if args.jobs > 1:
+        max_temp_bytes = args.max_temp_mb * 1024 * 1024 if args.max_temp_mb else None
+        runner = ParallelBatchRunner(analyzer, generators, args.output, args.jobs,
+                                     timeout=args.timeout, max_temp_bytes=max_temp_bytes)
+    else:
+        runner = BatchRunner(analyzer, generators, args.output)
+    started = time.perf_counter()
+    results = runner.run(entries)
+    summary_path = runner.write_summary(results, time.perf_counter() - started)
+    
+    print_batch_summary(results, summary_path)
+    
+    if any(result.status != 'ok' for result in results):
+        sys.exit(1)
+
+
+def run_server(args, analyzer, generators):
+    """Режим сервиса: анализатор и генераторы прогреты и обслуживают запросы до остановки"""
+    server = AnalysisServer(analyzer, generators, workers=args.jobs, max_pending=args.max_pending)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\n🛑 Сервис остановлен")
+
+
+def run_monorepo(args, analyzer, generators):
+    """Режим монорепозитория: анализ и конфигурация для каждого компонента"""
+    print(f"\n🚀 ЗАПУСК АНАЛИЗА МОНОРЕПОЗИТОРИЯ...")
+    
+    analyses = analyzer.analyze_monorepo(args.repo)
+    
+    print(f"✅ НАЙДЕНО КОМПОНЕНТОВ: {len(analyses)}")
+    for analysis in analyses:
+        print(f"   {analysis.component_path or '.'}: {analysis.language}"
+              f" ({analysis.framework or 'без фреймворка'}, {analysis.build_tool or 'сборка по умолчанию'})")
+    
+    output_files = []
+    for generator in generators:
+        print(f"\n🚀 ГЕНЕРАЦИЯ {generator.system_name.upper()} КОНФИГУРАЦИЙ КОМПОНЕНТОВ...")
+        
+        configs = generator.generate_components(analyses, args.output)
+        output_files.extend(
+            str(Path(args.output) / generator.get_component_output_filename(analysis)) for analysis in analyses
+        )
+        if len(configs) > len(analyses):
+            # Родительская конфигурация, запускающая конфигурации компонентов
+            output_files.append(str(Path(args.output) / generator.get_output_filename(analyses[0])))
+        
+        if all(generator.validate(config.config_content) for config in configs):
+            print(f"✅ {generator.system_name.upper()} КОНФИГУРАЦИИ УСПЕШНО ВАЛИДИРОВАНЫ")
+        else:
+            print(f"⚠️  ПРЕДУПРЕЖДЕНИЕ: {generator.system_name.upper()} конфигурации могут содержать синтаксические ошибки")
+    
+    print_success_message(output_files)
 
 
 def main():
     """Основная функция приложения"""
     args = parse_arguments()
+    # Замеры в процессах пула пакетного режима (--jobs > 1) в профиль не попадают
+    profiler = enable_profiling() if args.profile else None
     
     try:
         # Выводим приветственное сообщение
@@ -101,17 +349,44 @@ def main():
         
         if args.verbose:
             print(f"\n🔧 ПАРАМЕТРЫ ЗАПУСКА:")
-            print(f"   Репозиторий: {args.repo}")
+            if args.serve:
+                print(f"   Сервис: http://{args.host}:{args.port}")
+            elif args.repos_file:
+                print(f"   Список репозиториев: {args.repos_file}")
+            else:
+                print(f"   Репозиторий: {args.repo}")
             print(f"   CI/CD система: {args.system}")
             print(f"   Выходная директория: {args.output}")
+            print(f"   Режим клонирования: {args.clone_mode}")
+            print(f"   Монорепозиторий: {'Да' if args.monorepo else 'Нет'}")
             print(f"   Подробный режим: {'Да' if args.verbose else 'Нет'}")
         
         # Валидируем аргументы
         validate_arguments(args)
         
         # Создаем анализатор и генераторы
-        analyzer = RepositoryAnalyzer()
-        generators = get_generators(args.system)
+        analyzer = RepositoryAnalyzer(
+            ignored_dirs=DEFAULT_IGNORED_DIRS | set(args.ignore_dir),
+            respect_gitignore=not args.no_gitignore,
+            cache=None if args.no_cache else AnalysisCache(args.cache_dir),
+            clone_mode=args.clone_mode,
+            clone_timeout=args.timeout,
+            parallel_detectors=args.parallel_detectors,
+            mirror_pool=MirrorPool(args.mirror_dir, args.mirror_max_mb * 1024 * 1024) if args.mirror_dir else None
+        )
+        generators = get_generators(args.system, args.test_shards, args.dockerfile)
+        
+        if args.serve:
+            run_server(args, analyzer, generators)
+            return
+        
+        if args.repos_file:
+            run_batch(args, analyzer, generators)
+            return
+        
+        if args.monorepo:
+            run_monorepo(args, analyzer, generators)
+            return
         
         print(f"\n🚀 ЗАПУСК АНАЛИЗА РЕПОЗИТОРИЯ...")
         
@@ -125,26 +400,24 @@ def main():
             print(f"   Версия: {analysis.version}")
             print(f"   Инструмент сборки: {analysis.build_tool}")
             print(f"   Зависимости: {len(analysis.dependencies)}")
+            print(f"   Пропущено директорий: {analysis.pruned_dirs}")
+            if analysis.detection_scores:
+                scores = ", ".join(f"{lang}={score}" for lang, score in analysis.detection_scores.items())
+                print(f"   Оценки детекторов: {scores}")
+        
+        # Генерируем конфигурации для всех выбранных систем: общий контекст и запись за один проход
+        systems = ", ".join(generator.system_name.upper() for generator in generators)
+        print(f"\n🚀 ГЕНЕРАЦИЯ КОНФИГУРАЦИЙ: {systems}...")
+        
+        results = GenerationPipeline(generators).run(analysis, args.output)
+        configs = [result.config for result in results]
+        output_files = [result.output_path for result in results]
         
-        # Генерируем конфигурации для всех выбранных систем
-        output_files = []
-        configs = []
-        
-        for generator in generators:
-            print(f"\n🚀 ГЕНЕРАЦИЯ {generator.system_name.upper()} КОНФИГУРАЦИИ...")
-            
-            output_filename = generator.get_output_filename(analysis)
-            output_path = str(Path(args.output) / output_filename)
-            
-            config = generator.generate(analysis, output_path)
-            configs.append(config)
-            output_files.append(output_path)
-            
-            # Валидируем сгенерированную конфигурацию
-            if generator.validate(config.config_content):
-                print(f"✅ {generator.system_name.upper()} КОНФИГУРАЦИЯ УСПЕШНО ВАЛИДИРОВАНА")
+        for result in results:
+            if result.valid:
+                print(f"✅ {result.system.upper()} КОНФИГУРАЦИЯ УСПЕШНО ВАЛИДИРОВАНА ({result.render_seconds:.3f} с)")
             else:
-                print(f"⚠️  ПРЕДУПРЕЖДЕНИЕ: {generator.system_name.upper()} конфигурация может содержать синтаксические ошибки")
+                print(f"⚠️  ПРЕДУПРЕЖДЕНИЕ: {result.system.upper()} конфигурация может содержать синтаксические ошибки")
         
         # Выводим сводку для первой конфигурации
         if configs:
@@ -160,6 +433,11 @@ def main():
     except Exception as e:
         print_error_summary(e, "основной процесс")
         sys.exit(1)
+    finally:
+        if profiler is not None:
+            profile = profiler.to_dict()
+            json_path = profiler.write_json(str(Path(args.output) / "profile.json"))
+            print_profile(profile, json_path)
 
 
 if __name__ == "__main__":
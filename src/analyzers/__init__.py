@@ -1,5 +1,9 @@
 # Модули анализа репозитория
-from .models import ProjectAnalysis, CICDConfig
+from .models import ProjectAnalysis, CICDConfig, DetectionResult
+from .file_index import FileIndex
+from .git_tree_index import GitTreeIndex
+from .analysis_cache import AnalysisCache
+from .mirror_pool import MirrorPool
 from .repository_analyzer import RepositoryAnalyzer
 
-__all__ = ['ProjectAnalysis', 'CICDConfig', 'RepositoryAnalyzer']
\ No newline at end of file
+__all__ = ['ProjectAnalysis', 'CICDConfig', 'DetectionResult', 'RepositoryAnalyzer', 'FileIndex', 'GitTreeIndex', 'AnalysisCache', 'MirrorPool']
\ No newline at end of file
@@ -0,0 +1,104 @@
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import asdict, fields
+from pathlib import Path
+from typing import Any, Dict, Optional
+from .models import ProjectAnalysis
+
+
+# Версия формата записи: увеличивается при изменении логики анализа или полей ProjectAnalysis
+CACHE_FORMAT_VERSION = 4
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "self-deploy" / "analysis"
+DEFAULT_MAX_CACHE_BYTES = 64 * 1024 * 1024
+
+
+class AnalysisCache:
+    """Дисковый кеш результатов анализа, адресуемый по URL репозитория, SHA коммита и настройкам анализа"""
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: int = DEFAULT_MAX_CACHE_BYTES):
+        self.cache_dir = Path(cache_dir or os.getenv("SELF_DEPLOY_CACHE_DIR", DEFAULT_CACHE_DIR))
+        self.max_bytes = max_bytes
+
+    def _entry_path(self, repo_url: str, commit_sha: str, settings: Optional[Dict[str, Any]] = None) -> Path:
+        # Анализ с другим режимом клонирования или набором пропускаемых директорий - другая запись
+        key = f"{CACHE_FORMAT_VERSION}\n{repo_url}\n{commit_sha}\n{json.dumps(settings or {}, sort_keys=True)}"
+        return self.cache_dir / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()}.json"
+
+    def get(self, repo_url: str, commit_sha: str,
+            settings: Optional[Dict[str, Any]] = None) -> Optional[ProjectAnalysis]:
+        """Возвращает сохраненный анализ или None при промахе"""
+        entry_path = self._entry_path(repo_url, commit_sha, settings)
+        try:
+            data = json.loads(entry_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+        known_fields = {f.name for f in fields(ProjectAnalysis)}
+        try:
+            analysis = ProjectAnalysis(**{k: v for k, v in data.items() if k in known_fields})
+        except TypeError:
+            return None
+
+        # Обновляем время доступа для LRU-вытеснения
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+        return analysis
+
+    def put(self, repo_url: str, commit_sha: str, analysis: ProjectAnalysis,
+            settings: Optional[Dict[str, Any]] = None):
+        """Сохраняет анализ атомарно и вытесняет старые записи при превышении лимита"""
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            entry_path = self._entry_path(repo_url, commit_sha, settings)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        except OSError as e:
+            print(f"Предупреждение: не удалось сохранить анализ в кеш: {e}")
+            return
+
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(asdict(analysis), f, ensure_ascii=False)
+            os.replace(tmp_path, entry_path)
+        except (OSError, TypeError, ValueError) as e:
+            # Недописанный временный файл не попадает под evict (*.json), поэтому удаляется сразу
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            print(f"Предупреждение: не удалось сохранить анализ в кеш: {e}")
+            return
+
+        self.evict()
+
+    def evict(self):
+        """Удаляет давно не использованные записи, пока кеш превышает max_bytes"""
+        entries = []
+        for entry in self.cache_dir.glob("*.json"):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries, key=lambda item: item[0]):
+            if total_size <= self.max_bytes:
+                break
+            try:
+                entry.unlink()
+                total_size -= size
+            except OSError:
+                continue
+
+    def clear(self):
+        """Полностью очищает кеш"""
+        for entry in self.cache_dir.glob("*.json"):
+            try:
+                entry.unlink()
+            except OSError:
+                continue
@@ -1,12 +1,28 @@
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterator, List, Tuple
 from ...analyzers.models import ProjectAnalysis
+from ...analyzers.file_index import get_file_index, read_file_bytes
+from ...analyzers.source_sampler import sample_sources
 
 
 class BaseDetector(ABC):
     """Базовый класс для детекторов технологий"""
     
+    # Маркеры для каскадной детекции (переопределяются в подклассах)
+    manifest_files: List[str] = []    # манифесты сборки: pom.xml, go.mod, package.json...
+    source_patterns: List[str] = []   # исходники, проверяются только в последнюю очередь
+    auxiliary_files: List[str] = []   # прочие конфигурации, которые читает analyze
+    component_markers: List[str] = []  # манифесты, обозначающие корень компонента монорепозитория
+    test_patterns: List[str] = []     # файлы тестов (для разбиения тестов на шарды)
+    entry_points: List[str] = []      # вероятные точки входа: первыми читаются при поиске фреймворка
+    manifest_search_depth = 2         # глубина поиска манифестов на втором этапе
+    
+    # Оценки этапов каскада
+    SCORE_ROOT_MANIFEST = 3
+    SCORE_NESTED_MANIFEST = 2
+    SCORE_SOURCES_ONLY = 1
+    
     @property
     @abstractmethod
     def language_name(self) -> str:
@@ -18,51 +34,55 @@ class BaseDetector(ABC):
         """Определяет, подходит ли детектор для проекта"""
         pass
     
+    def score(self, repo_path: Path) -> int:
+        """Оценивает уверенность детектора: 0 - не подходит, больше - увереннее
+        
+        Каскад останавливается на первом положительном сигнале:
+        манифест в корне -> манифест на ограниченной глубине -> исходники по всему репозиторию.
+        """
+        if not self.manifest_files and not self.source_patterns:
+            return 1 if self.detect(repo_path) else 0
+        
+        file_index = get_file_index(repo_path)
+        if file_index.find_within_depth(self.manifest_files, 0):
+            return self.SCORE_ROOT_MANIFEST
+        if file_index.find_within_depth(self.manifest_files, self.manifest_search_depth):
+            return self.SCORE_NESTED_MANIFEST
+        for pattern in self.manifest_files + self.source_patterns:
+            if file_index.match(pattern):
+                return self.SCORE_SOURCES_ONLY
+        return 0
+    
     @abstractmethod
     def analyze(self, repo_path: Path) -> ProjectAnalysis:
         """Анализирует проект и возвращает данные"""
         pass
     
     def find_files_by_pattern(self, repo_path: Path, patterns: List[str]) -> List[Path]:
-        """Находит файлы по шаблонам в репозитории"""
-        found_files = []
-        for pattern in patterns:
-            for file_path in repo_path.rglob(pattern):
-                if file_path.is_file():
-                    found_files.append(file_path)
-        return found_files
+        """Находит файлы по шаблонам в репозитории (ответ из общего индекса файлов)"""
+        return get_file_index(repo_path).find(patterns)
+    
+    def find_test_files(self, repo_path: Path) -> List[str]:
+        """Возвращает отсортированные пути тестовых файлов относительно корня проекта"""
+        file_index = get_file_index(repo_path)
+        return sorted({rel_path for pattern in self.test_patterns for rel_path in file_index.match(pattern)})
+    
+    def sample_sources(self, repo_path: Path, patterns: List[str]) -> Iterator[Tuple[Path, str]]:
+        """Начало исходников для поиска фреймворка: сначала точки входа, тесты в конце, с бюджетом чтения"""
+        return sample_sources(repo_path, patterns, self.entry_points, self.test_patterns)
     
     def read_file_content(self, file_path: Path) -> str:
-        """Читает содержимое файла безопасно"""
+        """Читает содержимое файла безопасно (с диска или из git-объектов через индекс)"""
+        data = read_file_bytes(file_path)
+        if data is None:
+            return ""
         try:
-            return file_path.read_text(encoding='utf-8')
+            content = data.decode('utf-8')
         except UnicodeDecodeError:
-            try:
-                return file_path.read_text(encoding='latin-1')
-            except Exception:
-                return ""
-        except Exception:
-            return ""
+            content = data.decode('latin-1')
+        # Как и Path.read_text, приводим переводы строк к \n
+        return content.replace('\r\n', '\n').replace('\r', '\n')
     
     def get_project_structure(self, repo_path: Path, max_depth: int = 3) -> Dict[str, List[str]]:
         """Получает структуру проекта до указанной глубины"""
-        structure = {}
-        
-        def scan_directory(current_path: Path, current_depth: int, prefix: str = ""):
-            if current_depth > max_depth:
-                return
-            
-            items = []
-            for item in current_path.iterdir():
-                if item.is_dir():
-                    items.append(f"{item.name}/")
-                    if current_depth < max_depth:
-                        scan_directory(item, current_depth + 1, f"{prefix}  ")
-                else:
-                    items.append(item.name)
-            
-            if items:
-                structure[prefix + current_path.name] = sorted(items)
-        
-        scan_directory(repo_path, 0)
-        return structure
\ No newline at end of file
+        return get_file_index(repo_path).structure(max_depth)
\ No newline at end of file
@@ -8,18 +8,20 @@ from ...analyzers.models import ProjectAnalysis
 class GoDetector(BaseDetector):
     """Детектор для Go проектов"""
     
+    manifest_files = ["go.mod", "go.sum"]
+    component_markers = ["go.mod"]
+    source_patterns = ["**/*.go"]
+    test_patterns = ["*_test.go"]
+    entry_points = ["main.go", "server.go", "app.go", "router.go", "routes.go"]
+    
     @property
     def language_name(self) -> str:
         return "go"
     
     def detect(self, repo_path: Path) -> bool:
         """Определяет, является ли проект Go проектом"""
-        # Проверяем наличие go.mod или go.sum
-        go_mod_files = self.find_files_by_pattern(repo_path, ["go.mod"])
-        go_sum_files = self.find_files_by_pattern(repo_path, ["go.sum"])
-        go_src = self.find_files_by_pattern(repo_path, ["**/*.go"])
-        
-        return len(go_mod_files) > 0 or len(go_sum_files) > 0 or len(go_src) > 0
+        # Каскад: манифест в корне -> манифест на ограниченной глубине -> исходники
+        return self.score(repo_path) > 0
     
     def analyze(self, repo_path: Path) -> ProjectAnalysis:
         """Анализирует Go проект"""
@@ -129,11 +131,7 @@ class GoDetector(BaseDetector):
     
     def _detect_framework_from_source(self, repo_path: Path) -> Optional[str]:
         """Определяет фреймворк по исходному коду"""
-        go_files = self.find_files_by_pattern(repo_path, ["**/*.go"])
-        
-        for file_path in go_files[:10]:  # Проверяем только первые 10 файлов для производительности
-            content = self.read_file_content(file_path)
-            
+        for file_path, content in self.sample_sources(repo_path, ["**/*.go"]):
             # Ищем импорты и использование фреймворков
             if "github.com/gin-gonic/gin" in content and "gin.Default()" in content:
                 return "gin"
@@ -8,18 +8,22 @@ from ...analyzers.models import ProjectAnalysis
 class JavaDetector(BaseDetector):
     """Детектор для Java/Kotlin проектов"""
     
+    manifest_files = ["pom.xml", "build.gradle", "build.gradle.kts"]
+    component_markers = ["pom.xml", "build.gradle", "build.gradle.kts"]
+    source_patterns = ["src/main/java/**/*.java", "src/main/kotlin/**/*.kt"]
+    test_patterns = ["*Test.java", "*Tests.java", "*Test.kt"]
+    entry_points = [
+        "*Application.java", "*Application.kt", "Main.java", "Main.kt", "*Controller.java", "*Controller.kt",
+    ]
+    
     @property
     def language_name(self) -> str:
         return "java"
     
     def detect(self, repo_path: Path) -> bool:
         """Определяет, является ли проект Java/Kotlin проектом"""
-        # Проверяем наличие конфигурационных файлов Maven или Gradle
-        maven_files = self.find_files_by_pattern(repo_path, ["pom.xml"])
-        gradle_files = self.find_files_by_pattern(repo_path, ["build.gradle", "build.gradle.kts"])
-        java_src = self.find_files_by_pattern(repo_path, ["src/main/java/**/*.java", "src/main/kotlin/**/*.kt"])
-        
-        return len(maven_files) > 0 or len(gradle_files) > 0 or len(java_src) > 0
+        # Каскад: манифест в корне -> манифест на ограниченной глубине -> исходники
+        return self.score(repo_path) > 0
     
     def analyze(self, repo_path: Path) -> ProjectAnalysis:
         """Анализирует Java/Kotlin проект"""
@@ -150,14 +154,7 @@ class JavaDetector(BaseDetector):
     def _detect_framework_from_source(self, repo_path: Path) -> Optional[str]:
         """Определяет фреймворк по исходному коду"""
         # Ищем характерные аннотации и импорты
-        java_files = self.find_files_by_pattern(repo_path, ["**/*.java"])
-        kotlin_files = self.find_files_by_pattern(repo_path, ["**/*.kt"])
-        
-        all_files = java_files + kotlin_files
-        
-        for file_path in all_files[:10]:  # Проверяем только первые 10 файлов для производительности
-            content = self.read_file_content(file_path)
-            
+        for file_path, content in self.sample_sources(repo_path, ["**/*.java", "**/*.kt"]):
             if "@SpringBootApplication" in content:
                 return "spring-boot"
             elif "@MicronautApplication" in content or "io.micronaut" in content:
@@ -9,17 +9,31 @@ from ...analyzers.models import ProjectAnalysis
 class JSDetector(BaseDetector):
     """Детектор для JavaScript/TypeScript проектов"""
     
+    manifest_files = ["package.json"]
+    component_markers = ["package.json"]
+    source_patterns = ["**/*.js", "**/*.jsx", "**/*.ts", "**/*.tsx"]
+    test_patterns = [
+        "*.test.js", "*.test.jsx", "*.test.ts", "*.test.tsx",
+        "*.spec.js", "*.spec.jsx", "*.spec.ts", "*.spec.tsx",
+    ]
+    entry_points = [
+        "src/index.*", "src/main.*", "src/App.*", "src/app.*", "pages/_app.*",
+        "index.*", "server.*", "app.*", "main.*",
+    ]
+    auxiliary_files = [
+        "tsconfig.json", "webpack.config.js", "webpack.config.ts", "vite.config.js", "vite.config.ts",
+        "next.config.js", "next.config.ts", "nuxt.config.js", "nuxt.config.ts",
+        "svelte.config.js", "angular.json", "vue.config.js"
+    ]
+    
     @property
     def language_name(self) -> str:
         return "javascript"
     
     def detect(self, repo_path: Path) -> bool:
         """Определяет, является ли проект JavaScript/TypeScript проектом"""
-        # Проверяем наличие package.json
-        package_json_files = self.find_files_by_pattern(repo_path, ["package.json"])
-        js_files = self.find_files_by_pattern(repo_path, ["**/*.js", "**/*.jsx", "**/*.ts", "**/*.tsx"])
-        
-        return len(package_json_files) > 0 or len(js_files) > 0
+        # Каскад: манифест в корне -> манифест на ограниченной глубине -> исходники
+        return self.score(repo_path) > 0
     
     def analyze(self, repo_path: Path) -> ProjectAnalysis:
         """Анализирует JavaScript/TypeScript проект"""
@@ -56,6 +70,9 @@ class JSDetector(BaseDetector):
         if not framework:
             framework = self._detect_framework_from_source(repo_path)
         
+        # Angular собирает в поддиректорию проекта, путь задан в angular.json
+        build_output_dir = self._angular_output_dir(repo_path) if framework == "angular" else None
+        
         # Получаем структуру проекта
         project_structure = self.get_project_structure(repo_path)
         
@@ -68,7 +85,8 @@ class JSDetector(BaseDetector):
             config_files=config_files,
             project_structure=project_structure,
             repo_name="",  # Будет заполнено в analyzer
-            repo_url=""    # Будет заполнено в analyzer
+            repo_url="",   # Будет заполнено в analyzer
+            build_output_dir=build_output_dir
         )
     
     def _analyze_package_json(self, package_json_path: Path) -> dict:
@@ -132,14 +150,39 @@ class JSDetector(BaseDetector):
         
         return result
     
+    def _angular_output_dir(self, repo_path: Path) -> Optional[str]:
+        """Директория результата сборки приложения из angular.json (None - не удалось определить)"""
+        angular_files = self.find_files_by_pattern(repo_path, ["angular.json"])
+        if not angular_files:
+            return None
+        try:
+            # Ближайший к корню angular.json - конфигурация рабочего пространства
+            workspace = json.loads(self.read_file_content(min(angular_files, key=lambda p: len(p.parts))))
+            projects = workspace.get("projects") or {}
+            project = projects.get(workspace.get("defaultProject")) or next(iter(projects.values()), None)
+            build = ((project or {}).get("architect") or {}).get("build") or {}
+            output_path = (build.get("options") or {}).get("outputPath")
+        except (ValueError, AttributeError) as e:
+            print(f"Ошибка анализа angular.json: {e}")
+            return None
+        
+        # Сборщик application (Angular 17+) кладет файлы для браузера в поддиректорию browser
+        if isinstance(output_path, dict):
+            base = output_path.get("base")
+            browser = output_path.get("browser", "browser")
+            return f"{base.rstrip('/')}/{browser}".rstrip("/") if isinstance(base, str) and base else None
+        if not isinstance(output_path, str) or not output_path:
+            return None
+        output_path = output_path[2:] if output_path.startswith("./") else output_path
+        output_path = output_path.rstrip("/")
+        if str(build.get("builder", "")).endswith(":application"):
+            return f"{output_path}/browser"
+        return output_path
+    
     def _detect_framework_from_source(self, repo_path: Path) -> Optional[str]:
         """Определяет фреймворк по исходному коду"""
         # Ищем файлы с характерными импортами и шаблонами
-        js_files = self.find_files_by_pattern(repo_path, ["**/*.js", "**/*.jsx", "**/*.ts", "**/*.tsx"])
-        
-        for file_path in js_files[:15]:  # Проверяем только первые 15 файлов для производительности
-            content = self.read_file_content(file_path)
-            
+        for file_path, content in self.sample_sources(repo_path, ["**/*.js", "**/*.jsx", "**/*.ts", "**/*.tsx"]):
             # React - ищем JSX и импорты React
             if ("import React" in content or "from 'react'" in content) and ("<div>" in content or "React.createElement" in content):
                 return "react"
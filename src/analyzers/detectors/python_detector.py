@@ -9,21 +9,21 @@ from ...analyzers.models import ProjectAnalysis
 class PythonDetector(BaseDetector):
     """Детектор для Python проектов"""
     
+    manifest_files = ["pyproject.toml", "setup.py", "requirements.txt", "Pipfile"]
+    component_markers = ["pyproject.toml", "setup.py", "Pipfile"]
+    source_patterns = ["**/*.py"]
+    test_patterns = ["test_*.py", "*_test.py"]
+    entry_points = ["app.py", "main.py", "manage.py", "wsgi.py", "asgi.py", "settings.py", "urls.py", "__main__.py"]
+    auxiliary_files = ["manage.py", "wsgi.py", "asgi.py"]
+    
     @property
     def language_name(self) -> str:
         return "python"
     
     def detect(self, repo_path: Path) -> bool:
         """Определяет, является ли проект Python проектом"""
-        # Проверяем наличие конфигурационных файлов Python
-        requirements_files = self.find_files_by_pattern(repo_path, ["requirements.txt"])
-        pyproject_files = self.find_files_by_pattern(repo_path, ["pyproject.toml"])
-        setup_files = self.find_files_by_pattern(repo_path, ["setup.py"])
-        pipfile_files = self.find_files_by_pattern(repo_path, ["Pipfile"])
-        python_files = self.find_files_by_pattern(repo_path, ["**/*.py"])
-        
-        return (len(requirements_files) > 0 or len(pyproject_files) > 0 or 
-                len(setup_files) > 0 or len(pipfile_files) > 0 or len(python_files) > 0)
+        # Каскад: манифест в корне -> манифест на ограниченной глубине -> исходники
+        return self.score(repo_path) > 0
     
     def analyze(self, repo_path: Path) -> ProjectAnalysis:
         """Анализирует Python проект"""
@@ -267,11 +267,7 @@ class PythonDetector(BaseDetector):
     
     def _detect_framework_from_source(self, repo_path: Path) -> Optional[str]:
         """Определяет фреймворк по исходному коду"""
-        python_files = self.find_files_by_pattern(repo_path, ["**/*.py"])
-        
-        for file_path in python_files[:15]:  # Проверяем только первые 15 файлов для производительности
-            content = self.read_file_content(file_path)
-            
+        for file_path, content in self.sample_sources(repo_path, ["**/*.py"]):
             # Django - ищем характерные импорты и шаблоны
             if "from django." in content or "import django" in content:
                 if "WSGI_APPLICATION" in content or "urlpatterns" in content:
@@ -0,0 +1,401 @@
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from ..utils.profiling import span, add_counter
+
+
+# Директории с зависимостями, артефактами сборки и служебными данными: в них не заходим
+DEFAULT_IGNORED_DIRS = frozenset({
+    ".git", ".hg", ".svn",
+    "node_modules", "bower_components",
+    "venv", ".venv", "env", "__pycache__", ".tox", ".nox", ".mypy_cache", ".pytest_cache",
+    "target", ".gradle", ".m2",
+    "vendor",
+    "dist", "build",
+    ".idea", ".vscode",
+})
+
+
+class FileIndex:
+    """Индекс файлов репозитория, построенный за один обход файловой системы"""
+
+    def __init__(self, root: Path, ignored_dirs: Optional[Iterable[str]] = None,
+                 respect_gitignore: bool = True, paths: Optional[Iterable[str]] = None):
+        self.root = Path(root)
+        self.ignored_dirs = frozenset(DEFAULT_IGNORED_DIRS if ignored_dirs is None else ignored_dirs)
+        self.respect_gitignore = respect_gitignore
+        self.pruned_dirs = 0                            # количество пропущенных поддеревьев
+        self.pruned_paths: set = set()                  # относительные пути пропущенных директорий
+        self.files: List[str] = []                      # относительные пути файлов (posix)
+        self.by_name: Dict[str, List[str]] = {}         # имя файла -> относительные пути
+        self.by_suffix: Dict[str, List[str]] = {}       # расширение -> относительные пути
+        self.children: Dict[str, List[str]] = {}        # директория -> содержимое ("name/" для директорий)
+        self._pattern_cache: Dict[str, List[str]] = {}
+        if paths is None:
+            with span("fs.walk", root=str(root)):
+                self._build()
+                add_counter("files_walked", len(self.files))
+        else:
+            # Готовый список путей (например, из git ls-tree) - файловую систему не трогаем
+            with span("index.paths", root=str(root)):
+                self._build_from_paths(paths)
+                add_counter("files_walked", len(self.files))
+
+    def _build(self):
+        """Обходит репозиторий через os.scandir и заполняет индекс"""
+        stack: List[Tuple[str, List["_GitignoreRule"]]] = [("", [])]
+        while stack:
+            rel_dir, rules = stack.pop()
+            abs_dir = os.path.join(self.root, rel_dir) if rel_dir else str(self.root)
+            try:
+                with os.scandir(abs_dir) as it:
+                    dir_entries = list(it)
+            except OSError:
+                dir_entries = []
+
+            # Правила .gitignore текущей директории действуют на всё её поддерево
+            if self.respect_gitignore and any(entry.name == ".gitignore" for entry in dir_entries):
+                rules = rules + _read_gitignore(os.path.join(abs_dir, ".gitignore"), rel_dir)
+
+            entries = []
+            for entry in dir_entries:
+                rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                try:
+                    # Как и Path.rglob, не переходим по символическим ссылкам на директории
+                    if entry.is_dir(follow_symlinks=False):
+                        entries.append(f"{entry.name}/")
+                        if entry.name in self.ignored_dirs or _is_ignored(rules, rel_path):
+                            self.pruned_dirs += 1
+                            self.pruned_paths.add(rel_path)
+                        else:
+                            stack.append((rel_path, rules))
+                    elif entry.is_file():
+                        entries.append(entry.name)
+                        self._add_file(rel_path, entry.name)
+                    else:
+                        entries.append(entry.name)
+                except OSError:
+                    continue
+            self.children[rel_dir] = sorted(entries)
+
+        self.files.sort()
+        for paths in self.by_name.values():
+            paths.sort()
+        for paths in self.by_suffix.values():
+            paths.sort()
+
+    def _build_from_paths(self, paths: Iterable[str]):
+        """Заполняет индекс из списка относительных путей файлов"""
+        children: Dict[str, set] = {"": set()}
+        pruned = set()
+        for rel_path in paths:
+            parts = rel_path.strip("/").split("/")
+            rel_dir = ""
+            for part in parts[:-1]:
+                children.setdefault(rel_dir, set()).add(f"{part}/")
+                rel_dir = f"{rel_dir}/{part}" if rel_dir else part
+                if part in self.ignored_dirs:
+                    pruned.add(rel_dir)
+                    break
+            else:
+                children.setdefault(rel_dir, set()).add(parts[-1])
+                self._add_file("/".join(parts), parts[-1])
+
+        self.pruned_dirs = len(pruned)
+        self.pruned_paths = pruned
+        self.children = {rel_dir: sorted(entries) for rel_dir, entries in children.items()}
+        self.files.sort()
+        for paths_list in self.by_name.values():
+            paths_list.sort()
+        for paths_list in self.by_suffix.values():
+            paths_list.sort()
+
+    def _add_file(self, rel_path: str, name: str):
+        """Добавляет файл во все индексы"""
+        self.files.append(rel_path)
+        self.by_name.setdefault(name, []).append(rel_path)
+        suffix = os.path.splitext(name)[1]
+        if suffix:
+            self.by_suffix.setdefault(suffix, []).append(rel_path)
+
+    def match(self, pattern: str) -> List[str]:
+        """Возвращает относительные пути файлов, соответствующие шаблону (семантика Path.rglob)"""
+        if pattern not in self._pattern_cache:
+            self._pattern_cache[pattern] = self._match(pattern)
+        return self._pattern_cache[pattern]
+
+    def _match(self, pattern: str) -> List[str]:
+        # rglob(pattern) эквивалентен glob("**/" + pattern)
+        while pattern.startswith("**/"):
+            pattern = pattern[3:]
+
+        if "/" not in pattern:
+            # Точное имя файла - ответ прямо из индекса по имени
+            if not _has_wildcards(pattern):
+                return list(self.by_name.get(pattern, []))
+            # Шаблон вида *.ext - ответ из индекса по расширению
+            suffix = pattern[1:]
+            if pattern.startswith("*") and suffix.startswith(".") and not _has_wildcards(suffix):
+                return [p for p in self.by_suffix.get(suffix[suffix.rfind("."):], [])
+                        if p.endswith(suffix)]
+            regex = re.compile(_glob_to_regex(pattern))
+            return [p for p in self.files if regex.fullmatch(p.rsplit("/", 1)[-1])]
+
+        regex = re.compile(r"(?:.*/)?" + _glob_to_regex(pattern))
+        return [p for p in self.files if regex.fullmatch(p)]
+
+    def find(self, patterns: List[str]) -> List[Path]:
+        """Находит файлы по списку шаблонов и возвращает абсолютные пути"""
+        found_files = []
+        for pattern in patterns:
+            found_files.extend(self.root / rel_path for rel_path in self.match(pattern))
+        return found_files
+
+    def read_bytes(self, rel_path: str, limit: Optional[int] = None) -> Optional[bytes]:
+        """Читает содержимое файла по относительному пути (None при ошибке), не больше limit байт"""
+        try:
+            with open(os.path.join(self.root, rel_path), "rb") as f:
+                return f.read() if limit is None else f.read(limit)
+        except OSError:
+            return None
+
+    def close(self):
+        """Освобождает ресурсы индекса (для файловой системы - ничего)"""
+
+    def subindex(self, rel_dir: str, exclude: Iterable[str] = ()) -> "SubIndex":
+        """Возвращает индекс поддерева rel_dir без повторного обхода (exclude - вложенные поддеревья)"""
+        return SubIndex(self, rel_dir, exclude)
+
+    def find_within_depth(self, patterns: List[str], max_depth: int) -> List[Path]:
+        """Находит файлы по шаблонам не глубже max_depth директорий от корня (0 - только корень)"""
+        found_files = []
+        for pattern in patterns:
+            found_files.extend(self.root / rel_path for rel_path in self.match(pattern)
+                               if rel_path.count("/") <= max_depth)
+        return found_files
+
+    def structure(self, max_depth: int = 3) -> Dict[str, List[str]]:
+        """Строит структуру проекта до указанной глубины (формат BaseDetector.get_project_structure)"""
+        structure = {}
+
+        def scan_directory(rel_dir: str, name: str, current_depth: int, prefix: str = ""):
+            if current_depth > max_depth:
+                return
+
+            items = self.children.get(rel_dir, [])
+            if current_depth < max_depth:
+                for item in items:
+                    if item.endswith("/"):
+                        child = item[:-1]
+                        child_rel = f"{rel_dir}/{child}" if rel_dir else child
+                        scan_directory(child_rel, child, current_depth + 1, f"{prefix}  ")
+
+            if items:
+                structure[prefix + name] = list(items)
+
+        scan_directory("", self.root.name, 0)
+        return structure
+
+
+class SubIndex(FileIndex):
+    """Поддерево родительского индекса как самостоятельный индекс (компонент монорепозитория)
+
+    Файлы берутся из уже построенного родительского индекса, чтение делегируется ему же,
+    поэтому подындекс работает одинаково для рабочей копии и для git-объектов.
+    """
+
+    def __init__(self, parent: FileIndex, rel_dir: str, exclude: Iterable[str] = ()):
+        self.parent = parent
+        self.prefix = rel_dir.strip("/")
+        self.excluded = tuple(_relative_to(path.strip("/"), self.prefix) for path in exclude)
+        base = f"{self.prefix}/" if self.prefix else ""
+        paths = [path[len(base):] for path in parent.files
+                 if path.startswith(base) and not self._is_excluded(path[len(base):])]
+        super().__init__(parent.root / self.prefix if self.prefix else parent.root,
+                         parent.ignored_dirs, parent.respect_gitignore, paths=paths)
+
+        # Содержимое директорий копируем у родителя: в нем есть и пропущенные при обходе директории
+        self.children = {}
+        for rel_path, entries in parent.children.items():
+            if self.prefix and rel_path != self.prefix and not rel_path.startswith(base):
+                continue
+            sub_path = rel_path[len(base):]
+            if not self._is_excluded(sub_path):
+                self.children[sub_path] = list(entries)
+        self.pruned_dirs = len(self.excluded)
+        self.pruned_paths = {path[len(base):] for path in parent.pruned_paths if path.startswith(base)}
+
+    def _is_excluded(self, rel_path: str) -> bool:
+        return any(rel_path == path or rel_path.startswith(path + "/") for path in self.excluded)
+
+    def read_bytes(self, rel_path: str, limit: Optional[int] = None) -> Optional[bytes]:
+        return self.parent.read_bytes(f"{self.prefix}/{rel_path}" if self.prefix else rel_path, limit)
+
+
+def _relative_to(rel_path: str, prefix: str) -> str:
+    return rel_path[len(prefix) + 1:] if prefix and rel_path.startswith(prefix + "/") else rel_path
+
+
+def _has_wildcards(pattern: str) -> bool:
+    return any(char in pattern for char in "*?[")
+
+
+def _glob_to_regex(pattern: str) -> str:
+    """Преобразует glob-шаблон с поддержкой ** в регулярное выражение"""
+    parts = []
+    for segment in pattern.split("/"):
+        if segment == "**":
+            parts.append(None)
+            continue
+        regex = ""
+        i = 0
+        while i < len(segment):
+            char = segment[i]
+            if char == "*":
+                regex += "[^/]*"
+            elif char == "?":
+                regex += "[^/]"
+            elif char == "[":
+                end = segment.find("]", i + 1)
+                if end == -1:
+                    regex += re.escape(char)
+                else:
+                    body = segment[i + 1:end]
+                    if body.startswith("!"):
+                        body = "^" + body[1:]
+                    regex += f"[{body}]"
+                    i = end
+            else:
+                regex += re.escape(char)
+            i += 1
+        parts.append(regex)
+
+    result = ""
+    for index, part in enumerate(parts):
+        if part is None:
+            result += "(?:[^/]+/)*"
+        else:
+            result += part
+            if index < len(parts) - 1:
+                result += "/"
+    return result
+
+
+class _GitignoreRule:
+    """Правило .gitignore, применяемое к директориям при обходе"""
+
+    def __init__(self, base: str, pattern: str):
+        self.negated = pattern.startswith("!")
+        if self.negated:
+            pattern = pattern[1:]
+        pattern = pattern.rstrip("/")
+        # Шаблон со слешем привязан к директории .gitignore, без слеша - к имени на любой глубине
+        self.anchored = "/" in pattern
+        self.base = base
+        self.regex = re.compile(_glob_to_regex(pattern.lstrip("/")))
+
+    def matches(self, rel_path: str) -> bool:
+        if self.base:
+            if not rel_path.startswith(self.base + "/"):
+                return False
+            rel_path = rel_path[len(self.base) + 1:]
+        if self.anchored:
+            return self.regex.fullmatch(rel_path) is not None
+        return self.regex.fullmatch(rel_path.rsplit("/", 1)[-1]) is not None
+
+
+def _read_gitignore(gitignore_path: str, base: str) -> List[_GitignoreRule]:
+    """Читает правила из .gitignore"""
+    rules = []
+    try:
+        with open(gitignore_path, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#") or line in ("/", "!"):
+                    continue
+                rules.append(_GitignoreRule(base, line))
+    except OSError:
+        pass
+    return rules
+
+
+def _is_ignored(rules: List[_GitignoreRule], rel_path: str) -> bool:
+    """Проверяет директорию по правилам .gitignore (побеждает последнее совпавшее правило)"""
+    ignored = False
+    for rule in rules:
+        if rule.matches(rel_path):
+            ignored = not rule.negated
+    return ignored
+
+
+# Общий кеш индексов: один обход на репозиторий для всех детекторов
+_INDEX_CACHE: Dict[str, FileIndex] = {}
+_INDEX_LOCK = threading.Lock()
+
+
+def get_file_index(repo_path: Path, ignored_dirs: Optional[Iterable[str]] = None,
+                   respect_gitignore: bool = True) -> FileIndex:
+    """Возвращает индекс файлов репозитория, строя его при первом обращении
+
+    Параметры обхода учитываются только при построении нового индекса.
+    """
+    key = os.path.abspath(repo_path)
+    index = _INDEX_CACHE.get(key)
+    if index is None:
+        # Детекторы могут работать в параллельных потоках - индекс строится ровно один раз
+        with _INDEX_LOCK:
+            index = _INDEX_CACHE.get(key)
+            if index is None:
+                index = FileIndex(Path(repo_path), ignored_dirs, respect_gitignore)
+                _INDEX_CACHE[key] = index
+    return index
+
+
+def register_file_index(index: FileIndex) -> FileIndex:
+    """Регистрирует готовый индекс (например, построенный по git-объектам) для его корня"""
+    with _INDEX_LOCK:
+        previous = _INDEX_CACHE.get(os.path.abspath(index.root))
+        _INDEX_CACHE[os.path.abspath(index.root)] = index
+    if previous is not None and previous is not index:
+        previous.close()
+    return index
+
+
+def drop_file_index(repo_path: Path) -> Optional[FileIndex]:
+    """Удаляет индекс репозитория из кеша (после анализа или при изменении файлов)"""
+    with _INDEX_LOCK:
+        index = _INDEX_CACHE.pop(os.path.abspath(repo_path), None)
+    if index is not None:
+        index.close()
+    return index
+
+
+def read_file_bytes(file_path: Path, limit: Optional[int] = None) -> Optional[bytes]:
+    """Читает файл через индекс, которому он принадлежит, либо напрямую с диска
+
+    limit ограничивает чтение началом файла (None - файл целиком).
+    """
+    data = _read_file_bytes(file_path, limit)
+    if data is not None:
+        # Учитывается в замере текущей фазы (например, детектора) при --profile
+        add_counter("files_read")
+        add_counter("bytes_read", len(data))
+    return data
+
+
+def _read_file_bytes(file_path: Path, limit: Optional[int]) -> Optional[bytes]:
+    abs_path = os.path.abspath(file_path)
+    owner = None
+    for root, index in list(_INDEX_CACHE.items()):
+        if abs_path.startswith(root + os.sep) and (owner is None or len(root) > len(os.path.abspath(owner.root))):
+            owner = index
+    if owner is not None:
+        return owner.read_bytes(os.path.relpath(abs_path, os.path.abspath(owner.root)).replace(os.sep, "/"), limit)
+
+    try:
+        with open(abs_path, "rb") as f:
+            return f.read() if limit is None else f.read(limit)
+    except OSError:
+        return None
@@ -0,0 +1,43 @@
+import threading
+from pathlib import Path
+from typing import Iterable, Optional
+import git
+from .file_index import FileIndex
+from ..utils.profiling import span
+
+
+class GitTreeIndex(FileIndex):
+    """Индекс файлов по дереву коммита, читающий содержимое прямо из git-объектов
+    
+    Работает с bare/--no-checkout клоном: список файлов берется из git ls-tree,
+    содержимое - через постоянный процесс git cat-file --batch. Рабочая копия не нужна.
+    Правила .gitignore не применяются: в дереве коммита игнорируемых файлов нет.
+    """
+
+    def __init__(self, git_dir: Path, rev: str = "HEAD", ignored_dirs: Optional[Iterable[str]] = None):
+        self.repo = git.Repo(str(git_dir))
+        self.rev = rev
+        # Процесс git cat-file --batch общий, запросы к нему из разных потоков сериализуются
+        self._read_lock = threading.Lock()
+        with span("git.ls_tree", root=str(git_dir)):
+            listing = self.repo.git.ls_tree("-r", "-z", "--name-only", rev)
+        paths = [path for path in listing.split("\0") if path]
+        super().__init__(Path(git_dir), ignored_dirs, respect_gitignore=False, paths=paths)
+
+    def read_bytes(self, rel_path: str, limit: Optional[int] = None) -> Optional[bytes]:
+        """Читает блоб файла из объектов репозитория
+
+        git cat-file отдает блоб целиком, limit только обрезает результат.
+        """
+        try:
+            with self._read_lock:
+                _, type_name, _, data = self.repo.git.get_object_data(f"{self.rev}:{rel_path}")
+        except (ValueError, git.GitCommandError):
+            return None
+        if type_name != b"blob":
+            return None
+        return data if limit is None else data[:limit]
+
+    def close(self):
+        """Завершает фоновые процессы git cat-file"""
+        self.repo.close()
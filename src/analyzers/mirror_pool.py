@@ -0,0 +1,159 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+import git
+from ..utils.profiling import span
+
+
+DEFAULT_MIRROR_DIR = Path.home() / ".cache" / "self-deploy" / "mirrors"
+DEFAULT_MAX_MIRROR_BYTES = 10 * 1024 * 1024 * 1024
+
+# Блокировки зеркал по пути: клоны идут из параллельных потоков, а зеркало обновляется по одному
+_MIRROR_LOCKS: Dict[str, threading.Lock] = {}
+_MIRROR_LOCKS_GUARD = threading.Lock()
+
+
+def _mirror_lock(mirror_path: Path) -> threading.Lock:
+    with _MIRROR_LOCKS_GUARD:
+        return _MIRROR_LOCKS.setdefault(str(mirror_path), threading.Lock())
+
+
+class MirrorPool:
+    """Локальные bare-зеркала репозиториев, обновляемые инкрементальным git fetch
+
+    Клон для анализа делается из зеркала по file://, поэтому повторный анализ того же
+    репозитория стоит одного fetch изменений вместо полного клонирования. При превышении
+    max_bytes удаляются давно не использованные зеркала.
+    """
+
+    def __init__(self, mirror_dir: Optional[str] = None, max_bytes: int = DEFAULT_MAX_MIRROR_BYTES):
+        self.mirror_dir = Path(mirror_dir or os.getenv("SELF_DEPLOY_MIRROR_DIR", DEFAULT_MIRROR_DIR))
+        self.max_bytes = max_bytes
+
+    def mirror_path(self, repo_url: str) -> Path:
+        """Путь зеркала репозитория"""
+        return self.mirror_dir / f"{hashlib.sha256(repo_url.encode('utf-8')).hexdigest()[:24]}.git"
+
+    @contextmanager
+    def lease(self, repo_url: str, timeout: Optional[float] = None) -> Iterator[str]:
+        """Создает или обновляет зеркало и отдает file:// URL для клонирования из него
+
+        Пока контекст открыт, зеркало не обновляется другими потоками и не вытесняется.
+        """
+        mirror_path = self.mirror_path(repo_url)
+        with _mirror_lock(mirror_path):
+            if mirror_path.is_dir():
+                print(f"Обновление зеркала: {repo_url}")
+                with span("mirror.fetch", repo=repo_url):
+                    git.Repo(mirror_path).git.fetch("--prune", "origin", kill_after_timeout=timeout)
+            else:
+                print(f"Создание зеркала: {repo_url}")
+                with span("mirror.create", repo=repo_url):
+                    self._create(repo_url, mirror_path, timeout)
+            # Время использования для LRU-вытеснения и размер после обновления: evict не обходит зеркала
+            os.utime(mirror_path)
+            self._record_size(mirror_path)
+            yield mirror_path.as_uri()
+
+        self.evict(keep=mirror_path)
+
+    def _create(self, repo_url: str, mirror_path: Path, timeout: Optional[float]):
+        """Клонирует зеркало во временную директорию и атомарно переносит на место"""
+        self.mirror_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = tempfile.mkdtemp(dir=self.mirror_dir, suffix=".tmp")
+        try:
+            git.Git.check_unsafe_protocols(repo_url)
+            git.cmd.Git().clone("--mirror", "--", repo_url, tmp_path, kill_after_timeout=timeout)
+            # Клоны из зеркала могут запрашивать partial clone (--filter) в режиме sparse
+            git.Repo(tmp_path).git.config("uploadpack.allowFilter", "true")
+            os.replace(tmp_path, mirror_path)
+        except BaseException:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+
+    def _record_size(self, mirror_path: Path) -> int:
+        """Считает размер зеркала и сохраняет его рядом с зеркалом (вызывается под блокировкой зеркала)"""
+        size = _tree_size(mirror_path)
+        size_path = _size_path(mirror_path)
+        tmp_path = size_path.with_name(size_path.name + ".tmp")
+        try:
+            tmp_path.write_text(str(size), encoding="utf-8")
+            os.replace(tmp_path, size_path)
+        except OSError:
+            pass
+        return size
+
+    def _stored_size(self, mirror_path: Path) -> int:
+        """Сохраненный размер зеркала; для зеркала без записи размер считается один раз"""
+        try:
+            return int(_size_path(mirror_path).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            pass
+        lock = _mirror_lock(mirror_path)
+        # Зеркало, которое сейчас обновляется, запишет размер само; до этого оно не вытесняется
+        if not lock.acquire(blocking=False):
+            return 0
+        try:
+            return self._record_size(mirror_path)
+        finally:
+            lock.release()
+
+    def evict(self, keep: Optional[Path] = None):
+        """Удаляет давно не использованные зеркала, пока их суммарный размер превышает max_bytes
+
+        Размеры берутся из записей, сделанных после создания или обновления зеркал.
+        """
+        entries = []
+        for mirror_path in self.mirror_dir.glob("*.git"):
+            try:
+                entries.append((mirror_path.stat().st_mtime, self._stored_size(mirror_path), mirror_path))
+            except OSError:
+                continue
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, mirror_path in sorted(entries, key=lambda item: item[0]):
+            if total_size <= self.max_bytes:
+                break
+            # Только что использованное зеркало остается, даже если одно превышает лимит
+            if mirror_path == keep:
+                continue
+            lock = _mirror_lock(mirror_path)
+            # Зеркало, которое сейчас используется, не трогаем
+            if not lock.acquire(blocking=False):
+                continue
+            try:
+                shutil.rmtree(mirror_path)
+                _size_path(mirror_path).unlink(missing_ok=True)
+                total_size -= size
+            except OSError:
+                continue
+            finally:
+                lock.release()
+
+    def clear(self):
+        """Удаляет все зеркала"""
+        for mirror_path in self.mirror_dir.glob("*.git"):
+            with _mirror_lock(mirror_path):
+                shutil.rmtree(mirror_path, ignore_errors=True)
+                _size_path(mirror_path).unlink(missing_ok=True)
+
+
+def _size_path(mirror_path: Path) -> Path:
+    """Файл с сохраненным размером зеркала: <hash>.git -> <hash>.size"""
+    return mirror_path.with_suffix(".size")
+
+
+def _tree_size(path: Path) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                continue
+    return total
@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from typing import List, Dict, Optional
+from dataclasses import dataclass, field
+from typing import List, Dict, Optional, Any
 
 
 @dataclass
@@ -14,11 +14,30 @@ class ProjectAnalysis:
     project_structure: Dict[str, List[str]]
     repo_name: str
     repo_url: str
+    pruned_dirs: int = 0  # директории, пропущенные при обходе (node_modules, .git, .gitignore и т.п.)
+    detection_scores: Dict[str, int] = field(default_factory=dict)  # оценки детекторов по языкам
+    commit_sha: Optional[str] = None  # SHA проанализированного коммита (если известен)
+    component_path: str = ""  # путь компонента монорепозитория относительно корня ("" - корень)
+    change_paths: List[str] = field(default_factory=list)  # пути, изменения в которых затрагивают компонент ("dir/" - поддерево)
+    test_files: List[str] = field(default_factory=list)  # тестовые файлы относительно корня проекта
+    build_output_dir: Optional[str] = None  # результат сборки фронтенда относительно проекта (из angular.json)
 
     def __str__(self) -> str:
         return f"ProjectAnalysis(language={self.language}, framework={self.framework}, version={self.version}, build_tool={self.build_tool})"
 
 
+@dataclass
+class DetectionResult:
+    """Результат работы одного детектора на этапе определения языка"""
+    language: str
+    score: int  # 0 - детектор не подходит, чем больше - тем увереннее
+    detector: Any
+
+    @property
+    def matched(self) -> bool:
+        return self.score > 0
+
+
 @dataclass
 class CICDConfig:
     """Конфигурация CI/CD системы"""
@@ -27,6 +46,7 @@ class CICDConfig:
     variables: Dict[str, str]
     stages: List[str]
     config_content: str
+    job_graph: Dict[str, List[str]] = field(default_factory=dict)  # задание -> задания, от которых оно зависит
 
     def __str__(self) -> str:
         return f"CICDConfig(system={self.system}, template={self.template_name}, stages={len(self.stages)})"
\ No newline at end of file
@@ -1,20 +1,57 @@
 import os
 import tempfile
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, List
+from typing import Any, Dict, Optional, List, Iterable, Tuple
 import git
-from .models import ProjectAnalysis
+from .models import ProjectAnalysis, DetectionResult
+from .file_index import FileIndex, DEFAULT_IGNORED_DIRS, get_file_index, drop_file_index, register_file_index
+from .git_tree_index import GitTreeIndex
+from .analysis_cache import AnalysisCache
+from .mirror_pool import MirrorPool
+from .source_sampler import rank_sources
+from .detectors.base_detector import BaseDetector
 from .detectors.java_detector import JavaDetector
 from .detectors.go_detector import GoDetector
 from .detectors.js_detector import JSDetector
 from .detectors.python_detector import PythonDetector
+from ..utils.profiling import span
+
+
+# Режимы клонирования: полный shallow clone, partial clone + sparse checkout
+# или bare clone, анализируемый прямо из git-объектов без рабочей копии
+CLONE_MODES = ("full", "sparse", "tree")
+
+# Сколько исходных файлов на каждый шаблон детектора материализуется в sparse-режиме
+SPARSE_SOURCE_SAMPLE = 20
+
+# Список всех путей коммита в git-директории sparse-клона (через NUL): индекс строится по нему,
+# а не по рабочей копии, в которой есть только выбранные файлы
+SPARSE_LISTING_FILE = "self-deploy-tree"
 
 
 class RepositoryAnalyzer:
     """Анализатор Git-репозитория для определения стека технологий"""
     
-    def __init__(self):
+    def __init__(self, ignored_dirs: Optional[Iterable[str]] = None, respect_gitignore: bool = True,
+                 cache: Optional[AnalysisCache] = None, clone_mode: str = "full",
+                 clone_timeout: Optional[float] = None, parallel_detectors: bool = False,
+                 mirror_pool: Optional[MirrorPool] = None):
+        if clone_mode not in CLONE_MODES:
+            raise ValueError(f"Неподдерживаемый режим клонирования: {clone_mode}")
+        self.clone_mode = clone_mode
+        # Ограничение времени клонирования в секундах (git убивается по истечении)
+        self.clone_timeout = clone_timeout
+        # Запуск детекторов параллельно над общим индексом файлов
+        self.parallel_detectors = parallel_detectors
+        # Набор пропускаемых при обходе директорий (None - набор по умолчанию)
+        self.ignored_dirs = ignored_dirs
+        self.respect_gitignore = respect_gitignore
+        # Кеш результатов анализа по URL+SHA (None - кеш отключен)
+        self.cache = cache
+        # Локальные зеркала: клон делается из зеркала после инкрементального fetch (None - напрямую)
+        self.mirror_pool = mirror_pool
         self.detectors = [
             PythonDetector(),  # Python первый для приоритета над JS в смешанных проектах
             JavaDetector(),
@@ -25,85 +62,359 @@ class RepositoryAnalyzer:
     
     def clone_repository(self, repo_url: str) -> str:
         """Клонирует репозиторий во временную директорию"""
+        temp_dir = tempfile.mkdtemp(prefix="self_deploy_")
+        self.temp_dirs.append(temp_dir)
+        
         try:
-            temp_dir = tempfile.mkdtemp(prefix="self_deploy_")
-            self.temp_dirs.append(temp_dir)
-            
-            print(f"Клонирование репозитория: {repo_url}")
-            # Используем shallow clone для экономии места (только последний коммит)
-            # Добавляем single-branch для еще большей экономии места
-            git.Repo.clone_from(repo_url, temp_dir, depth=1, single_branch=True)
+            with span("clone", repo=repo_url, mode=self.clone_mode):
+                if self.mirror_pool is not None:
+                    with self.mirror_pool.lease(repo_url, self.clone_timeout) as mirror_url:
+                        self._clone_from(repo_url, mirror_url, temp_dir)
+                else:
+                    self._clone_from(repo_url, repo_url, temp_dir)
             print(f"Репо клонирован в: {temp_dir}")
             
             return temp_dir
         except git.GitCommandError as e:
-            # Очистка при ошибке клонирования
-            self.cleanup_temp_dirs()
+            # Очистка при ошибке клонирования (только своей директории - клоны могут идти параллельно)
+            self.remove_temp_dir(temp_dir)
             raise Exception(f"Ошибка клонирования репозитория: {e}")
         except Exception as e:
             # Очистка при любой другой ошибке
-            self.cleanup_temp_dirs()
+            self.remove_temp_dir(temp_dir)
             raise Exception(f"Неожиданная ошибка при клонировании: {e}")
     
+    def _clone_from(self, repo_url: str, source_url: str, temp_dir: str):
+        """Клонирует репозиторий из source_url (сам репозиторий или его локальное зеркало) в режиме clone_mode"""
+        print(f"Клонирование репозитория: {repo_url}")
+        if self.clone_mode == "sparse":
+            self._sparse_clone(source_url, temp_dir)
+        elif self.clone_mode == "tree":
+            self._clone(source_url, temp_dir, depth=1, single_branch=True, bare=True)
+        else:
+            # Используем shallow clone для экономии места (только последний коммит)
+            # Добавляем single-branch для еще большей экономии места
+            self._clone(source_url, temp_dir, depth=1, single_branch=True)
+    
+    def _clone(self, repo_url: str, temp_dir: str, **options) -> git.Repo:
+        """Выполняет git clone с опциями и ограничением по времени clone_timeout"""
+        git.Git.check_unsafe_protocols(repo_url)
+        git.cmd.Git().clone("--", repo_url, temp_dir, kill_after_timeout=self.clone_timeout, **options)
+        return git.Repo(temp_dir)
+    
+    def _sparse_clone(self, repo_url: str, temp_dir: str):
+        """Partial clone без блобов и sparse checkout только манифестов и выборки исходников"""
+        repo = self._clone(
+            repo_url, temp_dir,
+            depth=1, single_branch=True, no_checkout=True, filter="blob:none"
+        )
+        
+        # Список файлов берем из дерева коммита - блобы при этом не загружаются
+        listing = repo.git.ls_tree("-r", "-z", "--name-only", "HEAD")
+        paths = [path for path in listing.split("\0") if path]
+        selected_paths = self._select_sparse_paths(temp_dir, paths)
+        # Сохраняем рядом с клоном: анализ может выполняться в другом процессе (пакетный режим)
+        (Path(repo.git_dir) / SPARSE_LISTING_FILE).write_text(listing, encoding="utf-8")
+        
+        repo.git.config("core.sparseCheckout", "true")
+        sparse_file = Path(repo.git_dir) / "info" / "sparse-checkout"
+        sparse_file.parent.mkdir(parents=True, exist_ok=True)
+        sparse_file.write_text(
+            "".join(f"/{_escape_sparse_pattern(path)}\n" for path in selected_paths),
+            encoding="utf-8"
+        )
+        
+        # Материализуем только выбранные файлы (недостающие блобы догружаются одним запросом)
+        repo.git.read_tree("-mu", "HEAD")
+        print(f"Sparse checkout: {len(selected_paths)} из {len(paths)} файлов")
+    
+    def _select_sparse_paths(self, repo_path: str, paths: List[str]) -> List[str]:
+        """Выбирает манифесты, конфигурации и ограниченную выборку исходников для sparse checkout"""
+        tree_index = FileIndex(Path(repo_path), self.ignored_dirs, paths=paths)
+        
+        selected = set(tree_index.match(".gitignore"))
+        for detector in self.detectors:
+            for name in detector.manifest_files + detector.auxiliary_files:
+                selected.update(tree_index.match(name))
+            for pattern in detector.source_patterns:
+                # Те же файлы, что первыми прочитает поиск фреймворка по исходникам: точки входа, ближе к корню
+                selected.update(rank_sources(tree_index, [pattern], detector.entry_points, detector.test_patterns,
+                                             limit=SPARSE_SOURCE_SAMPLE))
+        
+        return sorted(selected)
+    
+    def resolve_remote_head(self, repo_url: str) -> Optional[str]:
+        """Определяет SHA HEAD удаленного репозитория через git ls-remote без клонирования"""
+        try:
+            with span("git.ls_remote", repo=repo_url):
+                output = git.cmd.Git().ls_remote(repo_url, "HEAD", kill_after_timeout=self.clone_timeout)
+        except git.GitCommandError as e:
+            print(f"Предупреждение: не удалось получить HEAD репозитория {repo_url}: {e}")
+            return None
+        
+        for line in output.splitlines():
+            parts = line.split()
+            if len(parts) == 2 and parts[1] == "HEAD":
+                return parts[0]
+        return None
+    
+    def cache_settings(self) -> Dict[str, Any]:
+        """Настройки, от которых зависит результат анализа (входят в ключ кеша)"""
+        ignored_dirs = DEFAULT_IGNORED_DIRS if self.ignored_dirs is None else self.ignored_dirs
+        return {
+            "clone_mode": self.clone_mode,
+            "ignored_dirs": sorted(ignored_dirs),
+            "respect_gitignore": self.respect_gitignore,
+        }
+    
+    def lookup_cached_analysis(self, repo_url: str) -> Tuple[Optional[str], Optional[ProjectAnalysis]]:
+        """Возвращает SHA HEAD и анализ из кеша (если есть); без кеша - (None, None)"""
+        commit_sha = self.resolve_remote_head(repo_url) if self.cache else None
+        if commit_sha:
+            cached_analysis = self.cache.get(repo_url, commit_sha, self.cache_settings())
+            if cached_analysis is not None:
+                print(f"Анализ найден в кеше (коммит {commit_sha[:12]}), клонирование пропущено")
+                return commit_sha, cached_analysis
+        return commit_sha, None
+    
     def analyze_project(self, repo_url: str) -> ProjectAnalysis:
         """Анализирует проект и возвращает результат анализа"""
+        commit_sha, cached_analysis = self.lookup_cached_analysis(repo_url)
+        if cached_analysis is not None:
+            return cached_analysis
+        
         repo_path_str = self.clone_repository(repo_url)
-        repo_path = Path(repo_path_str)
         
         try:
-            # Определяем основной язык и технологии
-            detected_language = self.detect_technology(repo_path)
-            
-            # Запускаем соответствующий детектор для детального анализа
-            analysis = None
-            for detector in self.detectors:
-                if detector.detect(repo_path):
-                    analysis = detector.analyze(repo_path)
-                    break
+            return self.analyze_clone(repo_url, Path(repo_path_str), commit_sha)
+        finally:
+            # Очищаем временные файлы
+            self.remove_temp_dir(repo_path_str)
+    
+    def resolve_clone_head(self, repo_path: Path) -> Optional[str]:
+        """SHA коммита, который реально склонирован (работает и для bare-клона режима tree)"""
+        try:
+            return git.Repo(repo_path).git.rev_parse("HEAD")
+        except (git.GitCommandError, git.InvalidGitRepositoryError, git.NoSuchPathError):
+            return None
+    
+    def analyze_clone(self, repo_url: str, repo_path: Path, commit_sha: Optional[str] = None) -> ProjectAnalysis:
+        """Анализирует уже склонированный репозиторий и сохраняет результат в кеш
+        
+        commit_sha - HEAD из git ls-remote до клонирования; запись кеша привязывается к HEAD
+        клона, так как между ls-remote и клонированием в репозиторий могли запушить.
+        """
+        clone_sha = self.resolve_clone_head(repo_path)
+        if commit_sha and clone_sha and clone_sha != commit_sha:
+            print(f"HEAD изменился после ls-remote: {commit_sha[:12]} -> {clone_sha[:12]}")
+        commit_sha = clone_sha
+        
+        try:
+            # Один обход файловой системы (или дерева коммита), общий для всех детекторов
+            file_index = self._build_file_index(repo_path, from_git_objects=self.clone_mode == "tree")
             
-            if analysis is None:
-                raise Exception("Не удалось определить стек технологий проекта")
+            analysis = self._detect_and_analyze(repo_path)
             
             # Добавляем информацию о репозитории
             analysis.repo_url = repo_url
             analysis.repo_name = self._get_repo_name_from_url(repo_url)
+            analysis.pruned_dirs = file_index.pruned_dirs
+            analysis.commit_sha = commit_sha
+            
+            if commit_sha and self.cache:
+                self.cache.put(repo_url, commit_sha, analysis, self.cache_settings())
             
             return analysis
             
         finally:
-            # Очищаем временные файлы
-            self.cleanup_temp_dirs()
+            # Очищаем индекс
+            drop_file_index(repo_path)
+    
+    def detect_technologies(self, repo_path: Path) -> List[DetectionResult]:
+        """Запускает каждый детектор ровно один раз и возвращает оценки по всем языкам
+        
+        Результаты отсортированы по убыванию оценки; при равных оценках сохраняется
+        порядок детекторов (Python приоритетнее JS в смешанных проектах).
+        """
+        if self.parallel_detectors and len(self.detectors) > 1:
+            # Детекторы независимы и читают один снимок файлов, поэтому безопасно выполняются одновременно
+            with ThreadPoolExecutor(max_workers=len(self.detectors), thread_name_prefix="detector") as executor:
+                scores = list(executor.map(lambda detector: self._score(detector, repo_path), self.detectors))
+        else:
+            scores = [self._score(detector, repo_path) for detector in self.detectors]
+        
+        results = [
+            DetectionResult(language=detector.language_name, score=score, detector=detector)
+            for detector, score in zip(self.detectors, scores)
+        ]
+        return sorted(results, key=lambda result: result.score, reverse=True)
+    
+    def _score(self, detector: BaseDetector, repo_path: Path) -> int:
+        with span(f"detect.{detector.language_name}"):
+            return detector.score(repo_path)
     
     def detect_technology(self, repo_path: Path) -> str:
         """Определяет основной язык программирования проекта"""
-        for detector in self.detectors:
-            if detector.detect(repo_path):
-                return detector.language_name
+        results = self.detect_technologies(repo_path)
+        if results and results[0].matched:
+            return results[0].language
         
         raise Exception("Не удалось определить язык программирования проекта")
     
+    def _detect_and_analyze(self, repo_path: Path) -> ProjectAnalysis:
+        """Один проход детекции и детальный анализ победившим детектором без повторного detect"""
+        results = self.detect_technologies(repo_path)
+        
+        if not results or not results[0].matched:
+            raise Exception("Не удалось определить стек технологий проекта")
+        
+        detector = results[0].detector
+        with span(f"analyze.{detector.language_name}"):
+            analysis = detector.analyze(repo_path)
+            analysis.test_files = detector.find_test_files(repo_path)
+        analysis.detection_scores = {result.language: result.score for result in results}
+        return analysis
+    
     def analyze_local_project(self, local_path: str) -> ProjectAnalysis:
         """Анализирует локальный проект без клонирования"""
         repo_path = Path(local_path)
         
-        # Определяем основной язык и технологии
-        detected_language = self.detect_technology(repo_path)
+        # Локальный проект мог измениться с прошлого анализа - строим индекс заново
+        drop_file_index(repo_path)
+        file_index = self._build_file_index(repo_path)
+        
+        try:
+            analysis = self._detect_and_analyze(repo_path)
+            
+            # Добавляем информацию о проекте
+            analysis.repo_url = f"file://{local_path}"
+            analysis.repo_name = repo_path.name
+            analysis.pruned_dirs = file_index.pruned_dirs
+            
+            return analysis
+            
+        finally:
+            drop_file_index(repo_path)
+    
+    def analyze_monorepo(self, repo_url: str) -> List[ProjectAnalysis]:
+        """Анализирует монорепозиторий и возвращает анализ каждого компонента
+        
+        Результаты по компонентам в кеш не сохраняются: кеш хранит один анализ на коммит.
+        """
+        repo_path_str = self.clone_repository(repo_url)
+        
+        try:
+            repo_path = Path(repo_path_str)
+            file_index = self._build_file_index(repo_path, from_git_objects=self.clone_mode == "tree")
+            try:
+                analyses = self.analyze_components(repo_path)
+            finally:
+                drop_file_index(repo_path)
+            
+            repo_name = self._get_repo_name_from_url(repo_url)
+            for analysis in analyses:
+                self._set_component_info(analysis, repo_url, repo_name, file_index)
+            return analyses
+        finally:
+            self.remove_temp_dir(repo_path_str)
+    
+    def analyze_local_monorepo(self, local_path: str) -> List[ProjectAnalysis]:
+        """Анализирует локальный монорепозиторий без клонирования"""
+        repo_path = Path(local_path)
+        
+        drop_file_index(repo_path)
+        file_index = self._build_file_index(repo_path)
+        
+        try:
+            analyses = self.analyze_components(repo_path)
+        finally:
+            drop_file_index(repo_path)
         
-        # Запускаем соответствующий детектор для детального анализа
-        analysis = None
+        for analysis in analyses:
+            self._set_component_info(analysis, f"file://{local_path}", repo_path.name, file_index)
+        return analyses
+    
+    def discover_components(self, repo_path: Path) -> List[Tuple[str, BaseDetector]]:
+        """Находит компоненты монорепозитория - директории с манифестами сборки
+        
+        Директории назначается первый по приоритету детектор, чей манифест в ней лежит.
+        Вложенные директории того же языка (модули Maven, workspaces npm) считаются
+        частью родительского компонента. Результат упорядочен от корня вглубь.
+        """
+        file_index = get_file_index(repo_path)
+        owners = {}
         for detector in self.detectors:
-            if detector.detect(repo_path):
-                analysis = detector.analyze(repo_path)
-                break
+            for marker in detector.component_markers:
+                for rel_path in file_index.match(marker):
+                    owners.setdefault(rel_path.rpartition("/")[0], detector)
         
-        if analysis is None:
-            raise Exception("Не удалось определить стек технологий проекта")
+        components = []
+        for rel_dir in sorted(owners, key=lambda path: (path.count("/") + 1 if path else 0, path)):
+            detector = owners[rel_dir]
+            if any(owner is detector and _is_within(rel_dir, parent) for parent, owner in components):
+                continue
+            components.append((rel_dir, detector))
+        return components
+    
+    def analyze_components(self, repo_path: Path) -> List[ProjectAnalysis]:
+        """Анализирует каждый компонент своим детектором над подындексом общего индекса
         
-        # Добавляем информацию о проекте
-        analysis.repo_url = f"file://{local_path}"
-        analysis.repo_name = repo_path.name
+        Без манифестов репозиторий анализируется целиком как один компонент.
+        Индекс репозитория должен быть построен заранее.
+        """
+        components = self.discover_components(repo_path)
+        if not components:
+            return [self._detect_and_analyze(repo_path)]
         
-        return analysis
+        file_index = get_file_index(repo_path)
+        
+        def analyze_component(component: Tuple[str, BaseDetector]) -> ProjectAnalysis:
+            rel_dir, detector = component
+            nested = [other for other, _ in components if other != rel_dir and _is_within(other, rel_dir)]
+            with span(f"analyze.{detector.language_name}", component=rel_dir or "."):
+                if not rel_dir:
+                    # Корневой компонент анализируется по полному индексу репозитория
+                    analysis = detector.analyze(repo_path)
+                    analysis.detection_scores = {detector.language_name: detector.score(repo_path)}
+                    analysis.test_files = [path for path in detector.find_test_files(repo_path)
+                                           if not any(_is_within(path, other) for other in nested)]
+                else:
+                    component_index = register_file_index(file_index.subindex(rel_dir, nested))
+                    try:
+                        analysis = detector.analyze(component_index.root)
+                        analysis.detection_scores = {detector.language_name: detector.score(component_index.root)}
+                        analysis.test_files = detector.find_test_files(component_index.root)
+                    finally:
+                        drop_file_index(component_index.root)
+            analysis.component_path = rel_dir
+            if len(components) > 1:
+                analysis.change_paths = _component_change_paths(file_index, rel_dir, nested)
+            return analysis
+        
+        # Компоненты независимы и читают общий снимок файлов
+        with ThreadPoolExecutor(max_workers=min(len(components), 8), thread_name_prefix="component") as executor:
+            return list(executor.map(analyze_component, components))
+    
+    def _set_component_info(self, analysis: ProjectAnalysis, repo_url: str, repo_name: str, file_index: FileIndex):
+        """Заполняет сведения о репозитории в анализе компонента"""
+        analysis.repo_url = repo_url
+        if analysis.component_path:
+            analysis.repo_name = f"{repo_name}-{analysis.component_path.replace('/', '-')}"
+        else:
+            analysis.repo_name = repo_name
+        analysis.pruned_dirs = file_index.pruned_dirs
+    
+    def _build_file_index(self, repo_path: Path, from_git_objects: bool = False):
+        """Строит общий индекс файлов с учетом настроек пропуска директорий"""
+        if from_git_objects:
+            return register_file_index(GitTreeIndex(repo_path, ignored_dirs=self.ignored_dirs))
+        listing_path = Path(repo_path) / ".git" / SPARSE_LISTING_FILE
+        if self.clone_mode == "sparse" and listing_path.is_file():
+            # Sparse-клон: индекс покрывает все дерево коммита, как в режиме tree; читаются
+            # только материализованные файлы, остальные считаются пустыми
+            paths = [path for path in listing_path.read_text(encoding="utf-8").split("\0") if path]
+            return register_file_index(FileIndex(Path(repo_path), self.ignored_dirs, paths=paths))
+        return get_file_index(repo_path, self.ignored_dirs, self.respect_gitignore)
     
     def _get_repo_name_from_url(self, repo_url: str) -> str:
         """Извлекает имя репозитория из URL"""
@@ -114,17 +425,66 @@ class RepositoryAnalyzer:
         # Извлекаем последнюю часть пути
         return repo_url.split('/')[-1]
     
+    def remove_temp_dir(self, temp_dir: str):
+        """Удаляет одну временную директорию клона"""
+        try:
+            if os.path.exists(temp_dir):
+                shutil.rmtree(temp_dir)
+        except Exception as e:
+            print(f"Предупреждение: не удалось удалить временную директорию {temp_dir}: {e}")
+        
+        if temp_dir in self.temp_dirs:
+            self.temp_dirs.remove(temp_dir)
+    
     def cleanup_temp_dirs(self):
         """Очищает все временные директории"""
-        for temp_dir in self.temp_dirs:
-            try:
-                if os.path.exists(temp_dir):
-                    shutil.rmtree(temp_dir)
-            except Exception as e:
-                print(f"Предупреждение: не удалось удалить временную директорию {temp_dir}: {e}")
+        for temp_dir in list(self.temp_dirs):
+            self.remove_temp_dir(temp_dir)
         
         self.temp_dirs = []
     
     def __del__(self):
         """Деструктор для очистки временных файлов"""
-        self.cleanup_temp_dirs()
\ No newline at end of file
+        self.cleanup_temp_dirs()
+
+
+def _component_change_paths(file_index: FileIndex, rel_dir: str, nested: List[str]) -> List[str]:
+    """Пути, изменения в которых затрагивают компонент: поддеревья ("dir/") и отдельные файлы
+    
+    Поддеревья вложенных компонентов исключаются; директории, содержащие их,
+    раскрываются до файлов и поддеревьев, не относящихся к вложенным компонентам.
+    Пропущенные при индексации директории (.git, node_modules, из .gitignore) не включаются.
+    """
+    if not nested:
+        return [f"{rel_dir}/"]
+    
+    change_paths = []
+    pending = [rel_dir]
+    while pending:
+        current = pending.pop()
+        for entry in file_index.children.get(current, []):
+            path = f"{current}/{entry}" if current else entry
+            if not entry.endswith("/"):
+                change_paths.append(path)
+                continue
+            child = path[:-1]
+            if child in nested or child in file_index.pruned_paths:
+                continue
+            if any(_is_within(other, child) for other in nested):
+                pending.append(child)
+            else:
+                change_paths.append(path)
+    return sorted(change_paths)
+
+
+def _is_within(rel_path: str, parent: str) -> bool:
+    """Проверяет, что относительный путь лежит внутри директории parent ("" - корень)"""
+    return not parent or rel_path.startswith(parent + "/")
+
+
+def _escape_sparse_pattern(path: str) -> str:
+    """Экранирует спецсимволы gitignore-синтаксиса в пути для файла sparse-checkout"""
+    escaped = "".join(f"\\{char}" if char in "*?[]\\" else char for char in path)
+    if escaped[:1] in ("#", "!"):
+        escaped = "\\" + escaped
+    return escaped.replace(" ", "\\ ") if escaped.endswith(" ") else escaped
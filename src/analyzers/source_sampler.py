@@ -0,0 +1,88 @@
+import heapq
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from .file_index import FileIndex, get_file_index, read_file_bytes
+
+
+# Сколько байт с начала файла читается: импорты и создание приложения обычно в начале файла
+SAMPLE_PREFIX_BYTES = 16 * 1024
+# Суммарный объем чтения исходников при поиске фреймворка в одном проекте
+SAMPLE_BYTE_BUDGET = 256 * 1024
+SAMPLE_MAX_FILES = 32
+
+# Строка длиннее этого среди первых строк файла - признак минифицированного бандла
+MINIFIED_LINE_LENGTH = 1000
+MINIFIED_HEAD_LINES = 5
+
+# Собранные и сгенерированные файлы: признаки фреймворка в них ложные, а размер большой
+EXCLUDED_SOURCE_PATTERNS = ["*.min.js", "*.bundle.js", "*.chunk.js", "*.d.ts"]
+
+
+def rank_sources(file_index: FileIndex, patterns: Iterable[str], entry_points: Sequence[str] = (),
+                 deprioritized: Sequence[str] = (), limit: Optional[int] = None) -> List[str]:
+    """Упорядочивает исходники по вероятности найти в них признаки фреймворка
+
+    Точки входа идут первыми в порядке entry_points, за ними остальные файлы, файлы из
+    deprioritized (тесты) - в конце; внутри группы - ближе к корню, затем по пути.
+    Порядок зависит только от набора файлов, а не от порядка обхода. limit - сколько
+    первых файлов нужно (None - все).
+    """
+    # Шаблоны сопоставляются через индекс (семантика rglob): "src/index.*" находит и "web/src/index.js"
+    excluded = {rel_path for pattern in EXCLUDED_SOURCE_PATTERNS for rel_path in file_index.match(pattern)}
+    candidates = {rel_path for pattern in patterns for rel_path in file_index.match(pattern)} - excluded
+    tiers: Dict[str, int] = {}
+    for tier, pattern in enumerate(entry_points):
+        for rel_path in file_index.match(pattern):
+            tiers.setdefault(rel_path, tier)
+    low_priority = {rel_path for pattern in deprioritized for rel_path in file_index.match(pattern)}
+
+    def rank(rel_path: str) -> Tuple[bool, int, int, str]:
+        return rel_path in low_priority, tiers.get(rel_path, len(entry_points)), rel_path.count("/"), rel_path
+
+    if limit is None:
+        return sorted(candidates, key=rank)
+    return heapq.nsmallest(limit, candidates, key=rank)
+
+
+def sample_sources(repo_path: Path, patterns: Iterable[str], entry_points: Sequence[str] = (),
+                   deprioritized: Sequence[str] = (), prefix_bytes: int = SAMPLE_PREFIX_BYTES,
+                   byte_budget: int = SAMPLE_BYTE_BUDGET,
+                   max_files: int = SAMPLE_MAX_FILES) -> Iterator[Tuple[Path, str]]:
+    """Отдает начало исходников проекта в порядке rank_sources: (путь, текст)
+
+    Из каждого файла читается не больше prefix_bytes, всего - не больше byte_budget байт
+    и max_files файлов. Минифицированные файлы пропускаются, но их чтение входит в бюджет.
+    """
+    file_index = get_file_index(repo_path)
+    remaining = byte_budget
+    for rel_path in rank_sources(file_index, patterns, entry_points, deprioritized, limit=max_files):
+        if remaining <= 0:
+            return
+        limit = min(prefix_bytes, remaining)
+        file_path = file_index.root / rel_path
+        data = read_file_bytes(file_path, limit)
+        if data is None:
+            continue
+        remaining -= len(data)
+        content = _decode_prefix(data, truncated=len(data) == limit)
+        if _looks_minified(content):
+            continue
+        yield file_path, content
+
+
+def _decode_prefix(data: bytes, truncated: bool) -> str:
+    try:
+        content = data.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # Обрезанное начало файла может заканчиваться на середине многобайтового символа
+        if truncated and e.start >= len(data) - 3:
+            content = data[:e.start].decode("utf-8")
+        else:
+            content = data.decode("latin-1")
+    return content.replace("\r\n", "\n").replace("\r", "\n")
+
+
+def _looks_minified(content: str) -> bool:
+    # У бандла перед минифицированным кодом бывает короткий баннер с лицензией
+    head = content.split("\n", MINIFIED_HEAD_LINES)[:MINIFIED_HEAD_LINES]
+    return any(len(line) > MINIFIED_LINE_LENGTH for line in head)
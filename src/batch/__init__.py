@@ -0,0 +1,5 @@
+# Пакетная обработка множества репозиториев в одном процессе
+from .runner import BatchEntry, BatchResult, BatchRunner, read_repos_file
+from .pool import ParallelBatchRunner, TempDiskBudget
+
+__all__ = ['BatchEntry', 'BatchResult', 'BatchRunner', 'read_repos_file', 'ParallelBatchRunner', 'TempDiskBudget']
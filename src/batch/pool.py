@@ -0,0 +1,212 @@
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+from ..analyzers import RepositoryAnalyzer, ProjectAnalysis
+from ..generators import BaseGenerator
+from ..utils.git_utils import validate_git_url
+from .runner import BatchEntry, BatchResult, BatchRunner, report_result
+
+
+@dataclass
+class _CloneOutcome:
+    """Результат этапа клонирования, передаваемый в пул анализа"""
+    entry: BatchEntry
+    repo_path: Optional[str] = None
+    commit_sha: Optional[str] = None
+    cached_analysis: Optional[ProjectAnalysis] = None
+    disk_usage: int = 0
+    clone_time: float = 0.0
+    error: Optional[str] = None
+
+
+class TempDiskBudget:
+    """Ограничивает число и суммарный размер клонов, ожидающих анализа на диске"""
+    
+    def __init__(self, max_clones: int, max_bytes: Optional[int] = None):
+        self.max_clones = max_clones
+        self.max_bytes = max_bytes
+        self.clones = 0
+        self.used_bytes = 0
+        self._condition = threading.Condition()
+    
+    def acquire(self):
+        """Ждет, пока на диске освободится место под очередной клон"""
+        with self._condition:
+            # Один клон допускается всегда, иначе слишком большой репозиторий заблокировал бы пакет
+            while self.clones > 0 and (self.clones >= self.max_clones or
+                                       (self.max_bytes is not None and self.used_bytes >= self.max_bytes)):
+                self._condition.wait()
+            self.clones += 1
+    
+    def account(self, size: int):
+        """Учитывает фактический размер склонированного репозитория"""
+        with self._condition:
+            self.used_bytes += size
+    
+    def release(self, size: int):
+        """Освобождает место после удаления клона"""
+        with self._condition:
+            self.clones -= 1
+            self.used_bytes -= size
+            self._condition.notify_all()
+
+
+class ParallelBatchRunner(BatchRunner):
+    """Пакетная обработка с перекрытием клонирования (потоки) и анализа с генерацией (процессы)"""
+    
+    def __init__(self, analyzer: RepositoryAnalyzer, generators: List[BaseGenerator], output_dir: str,
+                 jobs: int, timeout: Optional[float] = None, max_temp_bytes: Optional[int] = None):
+        super().__init__(analyzer, generators, output_dir)
+        self.jobs = max(1, jobs)
+        self.timeout = timeout
+        # Клонов на диске не больше, чем нужно, чтобы пул анализа не простаивал
+        self.disk_budget = TempDiskBudget(max_clones=self.jobs * 2, max_bytes=max_temp_bytes)
+    
+    def run(self, entries: List[BatchEntry]) -> List[BatchResult]:
+        """Обрабатывает репозитории параллельно; порядок результатов совпадает с порядком entries"""
+        results: List[Optional[BatchResult]] = [None] * len(entries)
+        
+        with ThreadPoolExecutor(max_workers=self.jobs, thread_name_prefix="clone") as clone_pool, \
+                ProcessPoolExecutor(max_workers=self.jobs, initializer=_init_worker,
+                                    initargs=(self.analyzer, self.generators, str(self.output_dir)),
+                                    # spawn: fork при работающих потоках клонирования небезопасен
+                                    mp_context=multiprocessing.get_context("spawn")) as analyze_pool:
+            clone_futures = {clone_pool.submit(self._clone_stage, entry): position
+                             for position, entry in enumerate(entries)}
+            analyze_futures = {}
+            
+            for clone_future in as_completed(clone_futures):
+                position = clone_futures[clone_future]
+                outcome = clone_future.result()
+                
+                if outcome.error:
+                    results[position] = _error_result(outcome.entry, outcome.error, outcome.clone_time)
+                    report_result(results[position])
+                    continue
+                
+                remaining = None
+                if self.timeout:
+                    remaining = max(self.timeout - outcome.clone_time, 1.0)
+                future = analyze_pool.submit(_analyze_in_worker, outcome, remaining)
+                future.add_done_callback(lambda _, outcome=outcome: self._release_clone(outcome))
+                analyze_futures[future] = position
+            
+            for future in as_completed(analyze_futures):
+                position = analyze_futures[future]
+                try:
+                    results[position] = future.result()
+                except Exception as e:
+                    results[position] = _error_result(entries[position], f"{type(e).__name__}: {e}", 0.0)
+                report_result(results[position])
+        
+        return results
+    
+    def _clone_stage(self, entry: BatchEntry) -> _CloneOutcome:
+        """Проверка кеша и клонирование в потоке пула (IO-bound)"""
+        outcome = _CloneOutcome(entry=entry)
+        started = time.perf_counter()
+        
+        try:
+            if not validate_git_url(entry.repo_url):
+                raise ValueError(f"Некорректный URL Git-репозитория: {entry.repo_url}")
+            
+            outcome.commit_sha, outcome.cached_analysis = self.analyzer.lookup_cached_analysis(entry.repo_url)
+            if outcome.cached_analysis is None:
+                self.disk_budget.acquire()
+                try:
+                    outcome.repo_path = self.analyzer.clone_repository(entry.repo_url)
+                except Exception:
+                    self.disk_budget.release(0)
+                    raise
+                outcome.disk_usage = _directory_size(outcome.repo_path)
+                self.disk_budget.account(outcome.disk_usage)
+        except Exception as e:
+            outcome.error = f"{type(e).__name__}: {e}"
+        
+        outcome.clone_time = round(time.perf_counter() - started, 4)
+        return outcome
+    
+    def _release_clone(self, outcome: _CloneOutcome):
+        """Удаляет клон после анализа и возвращает место в бюджет"""
+        if outcome.repo_path:
+            self.analyzer.remove_temp_dir(outcome.repo_path)
+            self.disk_budget.release(outcome.disk_usage)
+
+
+# Состояние процесса-обработчика: анализатор и генераторы создаются один раз на процесс
+_worker_runner: Optional[BatchRunner] = None
+
+
+def _init_worker(analyzer: RepositoryAnalyzer, generators: List[BaseGenerator], output_dir: str):
+    global _worker_runner
+    # Временными директориями клонов владеет родительский процесс
+    analyzer.temp_dirs = []
+    _worker_runner = BatchRunner(analyzer, generators, output_dir)
+
+
+def _analyze_in_worker(outcome: _CloneOutcome, timeout: Optional[float]) -> BatchResult:
+    """Анализ и генерация в процессе пула (CPU/FS-bound)"""
+    entry = outcome.entry
+    result = BatchResult(repo_url=entry.repo_url, name=entry.name, status='error')
+    result.timings['clone'] = outcome.clone_time
+    started = time.perf_counter()
+    
+    try:
+        with _deadline(timeout):
+            analysis = outcome.cached_analysis
+            if analysis is None:
+                analysis = _worker_runner.analyzer.analyze_clone(
+                    entry.repo_url, Path(outcome.repo_path), outcome.commit_sha
+                )
+            result.timings['analyze'] = round(time.perf_counter() - started, 4)
+            _worker_runner.generate_outputs(entry, analysis, result)
+    except Exception as e:
+        result.status = 'error'
+        result.error = f"{type(e).__name__}: {e}"
+    
+    result.timings['total'] = round(outcome.clone_time + time.perf_counter() - started, 4)
+    return result
+
+
+@contextmanager
+def _deadline(timeout: Optional[float]):
+    """Прерывает обработку по SIGALRM, если она дольше timeout секунд (только Unix)"""
+    if not timeout or not hasattr(signal, "setitimer"):
+        yield
+        return
+    
+    def on_timeout(signum, frame):
+        raise TimeoutError(f"Превышено время обработки репозитория ({timeout:.0f} с)")
+    
+    previous_handler = signal.signal(signal.SIGALRM, on_timeout)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous_handler)
+
+
+def _error_result(entry: BatchEntry, error: str, elapsed: float) -> BatchResult:
+    result = BatchResult(repo_url=entry.repo_url, name=entry.name, status='error', error=error)
+    result.timings['total'] = elapsed
+    return result
+
+
+def _directory_size(path: str) -> int:
+    """Суммарный размер файлов в директории"""
+    total = 0
+    for current_dir, _, file_names in os.walk(path):
+        for file_name in file_names:
+            try:
+                total += os.lstat(os.path.join(current_dir, file_name)).st_size
+            except OSError:
+                continue
+    return total
@@ -0,0 +1,144 @@
+import json
+import time
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Dict, List, Optional
+from ..analyzers import RepositoryAnalyzer, ProjectAnalysis
+from ..generators import BaseGenerator, GenerationPipeline
+from ..utils.git_utils import get_repo_name_from_url, validate_git_url
+
+
+@dataclass
+class BatchEntry:
+    """Репозиторий из файла пакетной обработки"""
+    repo_url: str
+    name: str
+
+
+@dataclass
+class BatchResult:
+    """Результат обработки одного репозитория"""
+    repo_url: str
+    name: str
+    status: str  # 'ok' или 'error'
+    language: Optional[str] = None
+    framework: Optional[str] = None
+    outputs: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+    timings: Dict[str, float] = field(default_factory=dict)  # секунды по фазам
+
+
+def read_repos_file(repos_file: str) -> List[BatchEntry]:
+    """Читает список репозиториев: один URL на строку или JSONL с полями repo/url и name"""
+    entries = []
+    used_names = set()
+    
+    with open(repos_file, encoding='utf-8') as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            # Пропускаем комментарии и пустые строки
+            if not line or line.startswith('#'):
+                continue
+            
+            if line.startswith('{'):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"Некорректный JSON в {repos_file}:{line_number}: {e}")
+                repo_url = record.get('repo') or record.get('url')
+                if not repo_url:
+                    raise ValueError(f"Нет поля repo/url в {repos_file}:{line_number}")
+                name = record.get('name') or get_repo_name_from_url(repo_url)
+            else:
+                repo_url = line
+                name = get_repo_name_from_url(repo_url)
+            
+            # Одинаковые имена репозиториев не должны перезаписывать выходные файлы друг друга
+            unique_name = name
+            suffix = 2
+            while unique_name in used_names:
+                unique_name = f"{name}-{suffix}"
+                suffix += 1
+            used_names.add(unique_name)
+            
+            entries.append(BatchEntry(repo_url=repo_url, name=unique_name))
+    
+    return entries
+
+
+def report_result(result: BatchResult):
+    """Печатает однострочный итог по репозиторию"""
+    if result.status == 'ok':
+        print(f"✅ {result.name}: {result.language} ({result.timings['total']:.2f} с)")
+    else:
+        print(f"❌ {result.name}: {result.error}")
+
+
+class BatchRunner:
+    """Анализ и генерация для множества репозиториев с общими анализатором и генераторами"""
+    
+    def __init__(self, analyzer: RepositoryAnalyzer, generators: List[BaseGenerator], output_dir: str):
+        self.analyzer = analyzer
+        self.generators = generators
+        self.pipeline = GenerationPipeline(generators)
+        self.output_dir = Path(output_dir)
+    
+    def process(self, entry: BatchEntry) -> BatchResult:
+        """Обрабатывает один репозиторий; ошибки не прерывают пакет, а попадают в результат"""
+        result = BatchResult(repo_url=entry.repo_url, name=entry.name, status='error')
+        started = time.perf_counter()
+        
+        try:
+            if not validate_git_url(entry.repo_url):
+                raise ValueError(f"Некорректный URL Git-репозитория: {entry.repo_url}")
+            
+            analysis = self.analyzer.analyze_project(entry.repo_url)
+            result.timings['analyze'] = round(time.perf_counter() - started, 4)
+            
+            self.generate_outputs(entry, analysis, result)
+        except Exception as e:
+            result.error = f"{type(e).__name__}: {e}"
+        
+        result.timings['total'] = round(time.perf_counter() - started, 4)
+        return result
+    
+    def generate_outputs(self, entry: BatchEntry, analysis: ProjectAnalysis, result: BatchResult):
+        """Генерирует конфигурации всех систем в директорию репозитория и отмечает успех"""
+        started = time.perf_counter()
+        result.language = analysis.language
+        result.framework = analysis.framework
+        
+        for generation in self.pipeline.run(analysis, str(self.output_dir / entry.name)):
+            if not generation.valid:
+                print(f"⚠️  {entry.name}: {generation.system} конфигурация может содержать синтаксические ошибки")
+            result.outputs.append(generation.output_path)
+            result.timings[f'render_{generation.system}'] = round(generation.render_seconds, 4)
+        
+        result.timings['generate'] = round(time.perf_counter() - started, 4)
+        result.status = 'ok'
+    
+    def run(self, entries: List[BatchEntry]) -> List[BatchResult]:
+        """Последовательно обрабатывает все репозитории"""
+        results = []
+        for position, entry in enumerate(entries, start=1):
+            print(f"\n[{position}/{len(entries)}] {entry.repo_url}")
+            result = self.process(entry)
+            report_result(result)
+            results.append(result)
+        return results
+    
+    def write_summary(self, results: List[BatchResult], duration: float,
+                      summary_path: Optional[str] = None) -> str:
+        """Сохраняет машиночитаемую сводку по пакету в JSON"""
+        summary = {
+            'total': len(results),
+            'succeeded': sum(1 for result in results if result.status == 'ok'),
+            'failed': sum(1 for result in results if result.status != 'ok'),
+            'duration': round(duration, 4),
+            'results': [asdict(result) for result in results]
+        }
+        
+        path = Path(summary_path) if summary_path else self.output_dir / 'batch_summary.json'
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(summary, ensure_ascii=False, indent=2), encoding='utf-8')
+        return str(path)
@@ -2,5 +2,8 @@
 from .base_generator import BaseGenerator
 from .jenkins_generator import JenkinsGenerator
 from .gitlab_generator import GitLabGenerator
+from .dockerfile_generator import DockerfileGenerator
+from .pipeline import GenerationPipeline, GenerationResult
 
-__all__ = ['BaseGenerator', 'JenkinsGenerator', 'GitLabGenerator']
\ No newline at end of file
+__all__ = ['BaseGenerator', 'JenkinsGenerator', 'GitLabGenerator', 'DockerfileGenerator',
+           'GenerationPipeline', 'GenerationResult']
\ No newline at end of file
@@ -1,44 +1,133 @@
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Union
 import os
+import threading
+import tempfile
 from ..analyzers.models import ProjectAnalysis, CICDConfig
+from .dependency_cache import get_dependency_cache
+from ..utils.profiling import span, add_counter
+
+
+# Скомпилированные шаблоны переживают процесс: повторный запуск не разбирает .j2 заново
+DEFAULT_BYTECODE_CACHE_DIR = Path.home() / ".cache" / "self-deploy" / "templates"
+
+# Общие окружения Jinja2 по директориям шаблонов: шаблоны компилируются один раз на процесс
+_ENVIRONMENTS: Dict[str, Any] = {}
+_ENVIRONMENTS_LOCK = threading.Lock()
+
+
+def get_template_environment(template_dir: str):
+    """Возвращает общее окружение Jinja2 для директории, компилируя все ее шаблоны при первом обращении"""
+    key = os.path.abspath(template_dir)
+    environment = _ENVIRONMENTS.get(key)
+    if environment is None:
+        # Генераторы создаются и в параллельных потоках - окружение строится ровно один раз
+        with _ENVIRONMENTS_LOCK:
+            environment = _ENVIRONMENTS.get(key)
+            if environment is None:
+                environment = _create_environment(key)
+                _ENVIRONMENTS[key] = environment
+    return environment
+
+
+def stage_file(content: str, output_path: str) -> str:
+    """Записывает содержимое во временный файл рядом с output_path и возвращает его путь
+
+    Временный файл лежит в той же директории, поэтому os.replace на output_path атомарен.
+    """
+    output_dir = Path(output_path).parent
+    output_dir.mkdir(parents=True, exist_ok=True)
+    
+    fd, tmp_path = tempfile.mkstemp(dir=output_dir, prefix=f".{Path(output_path).name}.", suffix=".tmp")
+    try:
+        with span("write", path=str(output_path)), os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+            add_counter("bytes_written", len(content.encode('utf-8')))
+        # mkstemp создает файл только для владельца
+        os.chmod(tmp_path, 0o644)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return tmp_path
+
+
+def _create_environment(template_dir: str):
+    """Создает окружение с дисковым кешем байткода и заранее компилирует шаблоны"""
+    try:
+        from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
+    except ImportError:
+        raise ImportError("Jinja2 не установлен. Установите его с помощью: pip install jinja2")
+    
+    bytecode_cache = None
+    cache_dir = Path(os.getenv("SELF_DEPLOY_TEMPLATE_CACHE_DIR", DEFAULT_BYTECODE_CACHE_DIR))
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(str(cache_dir))
+    except OSError as e:
+        print(f"Предупреждение: кеш скомпилированных шаблонов недоступен: {e}")
+    
+    environment = Environment(
+        loader=FileSystemLoader(template_dir),
+        trim_blocks=True,
+        lstrip_blocks=True,
+        bytecode_cache=bytecode_cache
+    )
+    # Все шаблоны директории попадают в кеш окружения; при наличии байткода разбор не выполняется
+    for template_name in environment.list_templates(extensions=["j2"]):
+        environment.get_template(template_name)
+    return environment
 
 
 class BaseGenerator(ABC):
     """Базовый класс для генераторов CI/CD конфигураций"""
     
-    def __init__(self, template_dir: str, system_name: str):
+    def __init__(self, template_dir: str, system_name: str, test_shards: Optional[Union[int, str]] = None):
         self.template_dir = template_dir
         self.system_name = system_name
+        # Разбиение модульных тестов: None - выключено, "auto" - по числу тестов, число - явное значение
+        self.test_shards = test_shards
         self.template_engine = None
         self._setup_template_engine()
     
+    def __getstate__(self):
+        # Окружение Jinja2 не сериализуется: процесс-получатель берет свое общее окружение
+        state = self.__dict__.copy()
+        state["template_env"] = None
+        state["template_engine"] = None
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._setup_template_engine()
+    
     def _setup_template_engine(self):
-        """Настраивает шаблонизатор Jinja2"""
-        try:
-            from jinja2 import Environment, FileSystemLoader, TemplateNotFound
-            self.template_env = Environment(
-                loader=FileSystemLoader(self.template_dir),
-                trim_blocks=True,
-                lstrip_blocks=True
-            )
-            self.template_engine = self.template_env
-        except ImportError:
-            raise ImportError("Jinja2 не установлен. Установите его с помощью: pip install jinja2")
+        """Настраивает шаблонизатор Jinja2 (окружение общее для всех генераторов с той же директорией)"""
+        self.template_env = get_template_environment(self.template_dir)
+        self.template_engine = self.template_env
     
     @abstractmethod
+    def render(self, analysis: ProjectAnalysis, shared_variables: Optional[Dict[str, Any]] = None) -> CICDConfig:
+        """Рендерит конфигурацию без записи на диск
+
+        shared_variables - общий для всех систем контекст из get_shared_variables;
+        если не передан, вычисляется заново.
+        """
+        pass
+    
     def generate(self, analysis: ProjectAnalysis, output_path: str) -> CICDConfig:
         """Генерирует конфигурационный файл"""
-        pass
+        config = self.render(analysis)
+        self.save_config(config.config_content, output_path)
+        return config
     
     @abstractmethod
     def validate(self, config_content: str) -> bool:
         """Валидирует сгенерированную конфигурацию"""
         pass
     
-    def get_template_variables(self, analysis: ProjectAnalysis) -> Dict[str, Any]:
-        """Возвращает переменные для шаблона на основе анализа проекта"""
+    def get_shared_variables(self, analysis: ProjectAnalysis) -> Dict[str, Any]:
+        """Переменные, общие для всех CI/CD систем: вычисляются один раз на анализ"""
         return {
             "project_name": analysis.repo_name,
             "language": analysis.language,
@@ -46,8 +135,36 @@ class BaseGenerator(ABC):
             "version": analysis.version or "1.0.0",
             "build_tool": analysis.build_tool or "default",
             "dependencies": analysis.dependencies,
-            "docker_registry": "registry.example.com",  # Можно настроить через переменные окружения
-            "sonar_project_key": analysis.repo_name.replace("/", "_")
+            "sonar_project_key": analysis.repo_name.replace("/", "_"),
+            # Компонент монорепозитория: команды выполняются в его директории
+            "component_path": analysis.component_path,
+            "path_prefix": f"{analysis.component_path}/" if analysis.component_path else "",
+            # Адреса инфраструктуры настраиваются через переменные окружения
+            "docker_registry": os.getenv("DOCKER_REGISTRY", "registry.example.com"),
+            "nexus_url": os.getenv("NEXUS_URL", "http://nexus:8081"),
+            "sonar_url": os.getenv("SONAR_URL", "http://sonarqube:9000"),
+            "k8s_namespace": os.getenv("K8S_NAMESPACE", "default"),
+            "ci_registry": os.getenv("CI_REGISTRY", "registry.gitlab.com")
+        }
+    
+    def get_template_variables(self, analysis: ProjectAnalysis,
+                               shared_variables: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Возвращает переменные для шаблона на основе анализа проекта"""
+        if shared_variables is None:
+            shared_variables = self.get_shared_variables(analysis)
+        return dict(shared_variables)
+    
+    def get_dependency_cache_variables(self, analysis: ProjectAnalysis, workspace_root: str) -> Optional[Dict[str, Any]]:
+        """Возвращает настройки кеша зависимостей для шаблона (workspace_root - корень рабочей копии в CI)"""
+        cache = get_dependency_cache(analysis)
+        if cache is None:
+            return None
+        
+        path_prefix = f"{analysis.component_path}/" if analysis.component_path else ""
+        return {
+            "key_files": [path_prefix + key_file for key_file in cache.key_files],
+            "paths": cache.paths + [path_prefix + path for path in cache.project_paths],
+            "variables": {name: value.format(root=workspace_root) for name, value in cache.variables.items()},
         }
     
     def render_template(self, template_name: str, variables: Dict[str, Any]) -> str:
@@ -55,24 +172,33 @@ class BaseGenerator(ABC):
         if not self.template_engine:
             raise RuntimeError("Шаблонизатор не инициализирован")
         
+        from jinja2 import TemplateNotFound
         try:
-            template = self.template_engine.get_template(template_name)
-            return template.render(**variables)
+            with span(f"render.{self.system_name}", template=template_name):
+                template = self.template_engine.get_template(template_name)
+                return template.render(**variables)
         except TemplateNotFound:
             raise FileNotFoundError(f"Шаблон {template_name} не найден в {self.template_dir}")
         except Exception as e:
             raise RuntimeError(f"Ошибка рендеринга шаблона {template_name}: {e}")
     
     def save_config(self, config_content: str, output_path: str) -> str:
-        """Сохраняет конфигурационный файл"""
-        output_dir = Path(output_path).parent
-        output_dir.mkdir(parents=True, exist_ok=True)
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(config_content)
-        
+        """Сохраняет конфигурационный файл атомарно: читатель видит старую или новую версию целиком"""
+        os.replace(stage_file(config_content, output_path), output_path)
         return output_path
     
     def get_output_filename(self, analysis: ProjectAnalysis) -> str:
         """Возвращает имя выходного файла на основе анализа и системы CI/CD"""
+        raise NotImplementedError("Должен быть реализован в подклассах")
+    
+    def generate_components(self, analyses: List[ProjectAnalysis], output_dir: str) -> List[CICDConfig]:
+        """Генерирует конфигурации для всех компонентов монорепозитория"""
+        configs = []
+        for analysis in analyses:
+            output_path = str(Path(output_dir) / self.get_component_output_filename(analysis))
+            configs.append(self.generate(analysis, output_path))
+        return configs
+    
+    def get_component_output_filename(self, analysis: ProjectAnalysis) -> str:
+        """Возвращает путь конфигурации компонента относительно выходной директории"""
         raise NotImplementedError("Должен быть реализован в подклассах")
\ No newline at end of file
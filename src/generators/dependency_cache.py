@@ -0,0 +1,127 @@
+from dataclasses import dataclass, field, replace
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Dict, List, Optional
+from ..analyzers.models import ProjectAnalysis
+
+
+@dataclass(frozen=True)
+class DependencyCache:
+    """Кеш зависимостей инструмента сборки, инвалидируемый по lock-файлам"""
+    key_files: List[str]                 # кандидаты в ключ по приоритету: файлы или шаблоны относительно проекта
+    paths: List[str]                     # кешируемые директории относительно корня рабочей копии
+    variables: Dict[str, str]            # переменные окружения инструментов; {root} - корень рабочей копии
+    project_paths: List[str] = field(default_factory=list)  # кешируемые директории внутри директории проекта
+
+
+# GitLab принимает не больше двух файлов в cache:key:files
+MAX_KEY_FILES = 2
+
+# Все кеши лежат в рабочей копии: GitLab кеширует только пути внутри $CI_PROJECT_DIR
+DEPENDENCY_CACHES = {
+    "pip": DependencyCache(
+        key_files=["requirements.txt", "requirements*.txt", "pyproject.toml", "setup.py", "Pipfile.lock", "poetry.lock"],
+        paths=[".cache/pip"],
+        variables={"PIP_CACHE_DIR": "{root}/.cache/pip"},
+    ),
+    "poetry": DependencyCache(
+        key_files=["poetry.lock"],
+        paths=[".cache/pip", ".cache/pypoetry"],
+        variables={
+            "PIP_CACHE_DIR": "{root}/.cache/pip",
+            "POETRY_CACHE_DIR": "{root}/.cache/pypoetry",
+            "POETRY_VIRTUALENVS_IN_PROJECT": "true",
+        },
+        project_paths=[".venv"],
+    ),
+    "pipenv": DependencyCache(
+        key_files=["Pipfile.lock"],
+        paths=[".cache/pip"],
+        variables={"PIP_CACHE_DIR": "{root}/.cache/pip", "PIPENV_VENV_IN_PROJECT": "1"},
+        project_paths=[".venv"],
+    ),
+    "flit": DependencyCache(
+        key_files=["pyproject.toml"],
+        paths=[".cache/pip"],
+        variables={"PIP_CACHE_DIR": "{root}/.cache/pip"},
+    ),
+    "maven": DependencyCache(
+        key_files=["pom.xml"],
+        paths=[".cache/maven"],
+        variables={"MAVEN_OPTS": "-Dmaven.repo.local={root}/.cache/maven"},
+    ),
+    "gradle": DependencyCache(
+        key_files=["build.gradle", "gradle/wrapper/gradle-wrapper.properties"],
+        paths=[".cache/gradle/caches", ".cache/gradle/wrapper"],
+        variables={"GRADLE_USER_HOME": "{root}/.cache/gradle"},
+    ),
+    "go": DependencyCache(
+        key_files=["go.sum", "go.mod"],
+        paths=[".cache/go-mod", ".cache/go-build"],
+        variables={"GOMODCACHE": "{root}/.cache/go-mod", "GOCACHE": "{root}/.cache/go-build"},
+    ),
+    "npm": DependencyCache(
+        key_files=["package-lock.json", "package.json"],
+        paths=[".cache/npm"],
+        variables={"npm_config_cache": "{root}/.cache/npm"},
+    ),
+    "yarn": DependencyCache(
+        key_files=["yarn.lock", "package.json"],
+        paths=[".cache/yarn"],
+        variables={"YARN_CACHE_FOLDER": "{root}/.cache/yarn"},
+    ),
+    "pnpm": DependencyCache(
+        key_files=["pnpm-lock.yaml", "package.json"],
+        paths=[".cache/pnpm-store"],
+        variables={"npm_config_store_dir": "{root}/.cache/pnpm-store"},
+    ),
+}
+
+
+def project_root_files(analysis: ProjectAnalysis) -> List[str]:
+    """Файлы корня проекта из структуры, собранной анализатором"""
+    return [item for item in _root_entries(analysis) if not item.endswith("/")]
+
+
+def _root_entries(analysis: ProjectAnalysis) -> List[str]:
+    """Содержимое корня проекта ("name/" для директорий); без структуры - имена конфигурационных файлов"""
+    for name, items in analysis.project_structure.items():
+        # Вложенные директории записаны с отступом
+        if not name.startswith(" "):
+            return list(items)
+    return [Path(path).name for path in analysis.config_files]
+
+
+def get_dependency_cache(analysis: ProjectAnalysis) -> Optional[DependencyCache]:
+    """Возвращает настройки кеша для инструмента сборки проекта (None - инструмент неизвестен)
+
+    В ключ попадают только существующие в проекте файлы; если таких нет, key_files пуст
+    и шаблоны используют постоянный ключ вместо ссылки на несуществующий файл.
+    """
+    cache = DEPENDENCY_CACHES.get(analysis.build_tool or "")
+    if cache is None:
+        return None
+
+    # Kotlin DSL: ключом служит build.gradle.kts, если он есть в проекте
+    if analysis.build_tool == "gradle" and any(Path(path).name == "build.gradle.kts" for path in analysis.config_files):
+        cache = DependencyCache(
+            key_files=["build.gradle.kts"] + cache.key_files[1:],
+            paths=cache.paths,
+            variables=cache.variables,
+            project_paths=cache.project_paths,
+        )
+    return replace(cache, key_files=_existing_key_files(cache.key_files, _root_entries(analysis)))
+
+
+def _existing_key_files(candidates: List[str], root_entries: List[str]) -> List[str]:
+    """Кандидаты в ключ кеша, присутствующие в проекте, не больше MAX_KEY_FILES"""
+    key_files = []
+    for candidate in candidates:
+        if "/" in candidate:
+            # Вложенный файл (gradle/wrapper/...) проверяется по наличию его директории в корне
+            if candidate.split("/", 1)[0] + "/" in root_entries:
+                key_files.append(candidate)
+            continue
+        key_files.extend(name for name in sorted(root_entries)
+                         if not name.endswith("/") and fnmatchcase(name, candidate) and name not in key_files)
+    return key_files[:MAX_KEY_FILES]
@@ -0,0 +1,171 @@
+import re
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+from .base_generator import BaseGenerator
+from .dependency_cache import project_root_files
+from ..analyzers.models import ProjectAnalysis, CICDConfig
+
+
+# Манифесты зависимостей, копируемые в образ до исходников: слой с установкой зависимостей
+# пересобирается только при их изменении. Копируются те, что есть в корне проекта.
+DEPENDENCY_MANIFESTS = {
+    "pip": ["requirements.txt", "pyproject.toml", "setup.py", "setup.cfg"],
+    "poetry": ["pyproject.toml", "poetry.lock"],
+    "pipenv": ["Pipfile", "Pipfile.lock"],
+    "flit": ["pyproject.toml"],
+    "maven": ["pom.xml"],
+    "gradle": ["build.gradle", "build.gradle.kts", "settings.gradle", "settings.gradle.kts", "gradle.properties"],
+    "go": ["go.mod", "go.sum"],
+    "npm": ["package.json", "package-lock.json"],
+    "yarn": ["package.json", "yarn.lock"],
+    "pnpm": ["package.json", "pnpm-lock.yaml"],
+}
+
+# Версии базовых образов, если анализ не определил версию языка
+DEFAULT_RUNTIME_VERSIONS = {
+    "python": "3.11",
+    "java": "17",
+    "go": "1.21",
+    "javascript": "20",
+}
+
+# Фреймворки, собираемые в статику: в итоговом образе только nginx и результат сборки
+STATIC_FRONTEND_FRAMEWORKS = frozenset({"react", "vue", "angular", "svelte"})
+
+# Директория результата сборки по умолчанию: Create React App и SvelteKit (adapter-static)
+# собирают в build, Vite и Vue CLI - в dist
+STATIC_OUTPUT_DIRS = {
+    "react": "build",
+    "vue": "dist",
+    "svelte": "dist",
+}
+VITE_OUTPUT_DIR = "dist"
+SVELTEKIT_OUTPUT_DIR = "build"
+
+# Инструкции Dockerfile, допустимые при валидации
+DOCKERFILE_INSTRUCTIONS = frozenset({
+    "FROM", "RUN", "CMD", "LABEL", "EXPOSE", "ENV", "ADD", "COPY", "ENTRYPOINT", "VOLUME",
+    "USER", "WORKDIR", "ARG", "ONBUILD", "STOPSIGNAL", "HEALTHCHECK", "SHELL", "MAINTAINER",
+})
+
+
+class DockerfileGenerator(BaseGenerator):
+    """Генератор многоэтапного Dockerfile под стек проекта
+
+    Зависимости устанавливаются отдельным слоем до копирования исходников с cache mount
+    инструмента сборки, итоговый образ содержит только среду выполнения и артефакты.
+    """
+
+    def __init__(self):
+        template_dir = str(Path(__file__).parent.parent / "templates" / "docker")
+        super().__init__(template_dir, "docker")
+
+    def render(self, analysis: ProjectAnalysis, shared_variables: Optional[Dict[str, Any]] = None) -> CICDConfig:
+        """Рендерит Dockerfile на основе анализа проекта"""
+        template_name = self._get_template_name(analysis)
+        variables = self.get_template_variables(analysis, shared_variables)
+        config_content = self.render_template(template_name, variables)
+
+        return CICDConfig(
+            system="docker",
+            template_name=template_name,
+            variables=variables,
+            stages=self.get_build_stages(config_content),
+            config_content=config_content
+        )
+
+    def validate(self, config_content: str) -> bool:
+        """Проверяет, что Dockerfile многоэтапный и состоит из известных инструкций"""
+        instructions = []
+        continued = False
+        for line in config_content.splitlines():
+            stripped = line.strip()
+            if not stripped or stripped.startswith("#"):
+                continue
+            if not continued:
+                instructions.append(stripped.split()[0].upper())
+            continued = stripped.endswith("\\")
+
+        if not instructions or any(instruction not in DOCKERFILE_INSTRUCTIONS for instruction in instructions):
+            return False
+        # До первого FROM допускаются только ARG
+        first_stage = instructions.index("FROM") if "FROM" in instructions else -1
+        if first_stage < 0 or any(instruction != "ARG" for instruction in instructions[:first_stage]):
+            return False
+        return instructions.count("FROM") >= 2
+
+    def get_build_stages(self, config_content: str) -> List[str]:
+        """Возвращает имена этапов сборки (FROM ... AS имя) в порядке объявления"""
+        return re.findall(r"^FROM\s+\S+\s+AS\s+(\S+)", config_content, flags=re.MULTILINE | re.IGNORECASE)
+
+    def get_output_filename(self, analysis: ProjectAnalysis) -> str:
+        """Возвращает имя выходного файла"""
+        return "Dockerfile"
+
+    def get_component_output_filename(self, analysis: ProjectAnalysis) -> str:
+        """Dockerfile компонента лежит в его директории"""
+        if analysis.component_path:
+            return f"{analysis.component_path}/Dockerfile"
+        return "Dockerfile"
+
+    def _get_template_name(self, analysis: ProjectAnalysis) -> str:
+        """Определяет имя шаблона на основе языка проекта"""
+        language_to_template = {
+            "java": "java.j2",
+            "go": "go.j2",
+            "javascript": "javascript.j2",
+            "python": "python.j2"
+        }
+
+        template_name = language_to_template.get(analysis.language)
+        if not template_name:
+            raise ValueError(f"Нет шаблона Dockerfile для языка: {analysis.language}")
+
+        return template_name
+
+    def get_template_variables(self, analysis: ProjectAnalysis,
+                               shared_variables: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Расширяет базовые переменные для Dockerfile"""
+        variables = super().get_template_variables(analysis, shared_variables)
+
+        variables.update({
+            "runtime_version": self._get_runtime_version(analysis),
+            "dependency_files": self._get_dependency_files(analysis),
+            "static_frontend": analysis.language == "javascript" and analysis.framework in STATIC_FRONTEND_FRAMEWORKS,
+            "static_output_dir": self._get_static_output_dir(analysis),
+            "kotlin_dsl": "build.gradle.kts" in project_root_files(analysis),
+            "maven_modules": self._is_maven_multi_module(analysis),
+        })
+        return variables
+
+    def _get_runtime_version(self, analysis: ProjectAnalysis) -> str:
+        """Версия языка для базовых образов"""
+        # Только для Go анализ возвращает версию языка (директива go в go.mod), у остальных - версию проекта
+        if analysis.language == "go" and analysis.version:
+            return ".".join(analysis.version.split(".")[:2])
+        return DEFAULT_RUNTIME_VERSIONS.get(analysis.language, "latest")
+
+    def _get_dependency_files(self, analysis: ProjectAnalysis) -> List[str]:
+        """Манифесты зависимостей инструмента сборки, присутствующие в корне проекта"""
+        root_files = project_root_files(analysis)
+        manifests = DEPENDENCY_MANIFESTS.get(analysis.build_tool or "", [])
+        return [name for name in manifests if name in root_files]
+
+    def _is_maven_multi_module(self, analysis: ProjectAnalysis) -> bool:
+        """Многомодульный Maven-проект: кроме корневого pom.xml есть pom.xml модулей"""
+        if analysis.build_tool != "maven":
+            return False
+        return sum(1 for path in analysis.config_files if Path(path).name == "pom.xml") > 1
+
+    def _get_static_output_dir(self, analysis: ProjectAnalysis) -> str:
+        """Директория результата сборки статического фронтенда относительно проекта"""
+        if analysis.framework == "angular":
+            # Angular собирает в dist/<проект>; путь из angular.json, если анализ его нашел
+            return analysis.build_output_dir or f"dist/{analysis.repo_name}"
+        if analysis.framework == "svelte" and "@sveltejs/kit" in analysis.dependencies:
+            return SVELTEKIT_OUTPUT_DIR
+        if analysis.framework == "react" and "react-scripts" not in analysis.dependencies and (
+                "vite" in analysis.dependencies
+                or any(name.startswith("vite.config.") for name in project_root_files(analysis))):
+            return VITE_OUTPUT_DIR
+        return STATIC_OUTPUT_DIRS.get(analysis.framework or "", "dist")
@@ -1,40 +1,62 @@
-import os
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Union
 import yaml
 import re
 from .base_generator import BaseGenerator
+from .test_sharding import choose_shard_count, shard_command
 from ..analyzers.models import ProjectAnalysis, CICDConfig
 
 
+# Ключи верхнего уровня .gitlab-ci.yml, которые не являются заданиями
+GLOBAL_KEYWORDS = frozenset({
+    "stages", "variables", "default", "include", "workflow",
+    "cache", "image", "services", "before_script", "after_script",
+})
+
+# Задания пайплайна в порядке стадий: (задание, стадия, задания, результаты которых ему нужны).
+# Задание запускается, как только готовы его зависимости, а не вся предыдущая стадия:
+# анализ кода и сборка образа не ждут тестов, публикация ждет все проверки.
+PIPELINE_JOBS = [
+    ("build", "build", []),
+    ("unit_tests", "test", ["build"]),
+    ("integration_tests", "test", ["build"]),
+    ("code_analysis", "code_analysis", ["build"]),
+    ("docker_build", "docker_build", ["build"]),
+    ("publish", "publish", ["build", "unit_tests", "integration_tests", "code_analysis", "docker_build"]),
+    ("deploy_staging", "deploy_staging", ["publish"]),
+    ("deploy_production", "deploy_production", ["publish"]),
+]
+
+# Дочерние конфигурации компонентов монорепозитория
+COMPONENTS_CONFIG_DIR = ".gitlab/ci"
+
+
 class GitLabGenerator(BaseGenerator):
     """Генератор конфигураций для GitLab CI"""
     
-    def __init__(self):
+    def __init__(self, test_shards: Optional[Union[int, str]] = None):
         template_dir = str(Path(__file__).parent.parent / "templates" / "gitlab")
-        super().__init__(template_dir, "gitlab")
+        super().__init__(template_dir, "gitlab", test_shards)
     
-    def generate(self, analysis: ProjectAnalysis, output_path: str) -> CICDConfig:
-        """Генерирует .gitlab-ci.yml на основе анализа проекта"""
+    def render(self, analysis: ProjectAnalysis, shared_variables: Optional[Dict[str, Any]] = None) -> CICDConfig:
+        """Рендерит .gitlab-ci.yml на основе анализа проекта"""
         # Определяем имя шаблона на основе языка
         template_name = self._get_template_name(analysis)
         
         # Получаем переменные для шаблона
-        variables = self.get_template_variables(analysis)
+        variables = self.get_template_variables(analysis, shared_variables)
         
         # Рендерим шаблон
         config_content = self.render_template(template_name, variables)
         
-        # Сохраняем конфигурационный файл
-        final_output_path = self.save_config(config_content, output_path)
-        
         # Создаем объект конфигурации
         config = CICDConfig(
             system="gitlab",
             template_name=template_name,
             variables=variables,
-            stages=["build", "test", "code_analysis", "docker_build", "publish", "deploy_staging", "deploy_production"],
-            config_content=config_content
+            stages=self.get_stages(),
+            config_content=config_content,
+            job_graph=variables["job_graph"]
         )
         
         return config
@@ -58,7 +80,7 @@ class GitLabGenerator(BaseGenerator):
                 return False
             
             # Проверяем наличие хотя бы одного job
-            jobs = [key for key in parsed_yaml.keys() if not key.startswith('.') and key != 'stages' and key != 'variables']
+            jobs = [key for key in parsed_yaml.keys() if not key.startswith('.') and key not in GLOBAL_KEYWORDS]
             if len(jobs) == 0:
                 return False
             
@@ -68,6 +90,13 @@ class GitLabGenerator(BaseGenerator):
                 if not isinstance(job_config, dict) or "stage" not in job_config:
                     return False
             
+            # Проверяем, что needs ссылаются на существующие задания
+            for job_name in jobs:
+                for need in parsed_yaml[job_name].get("needs") or []:
+                    needed_job = need.get("job") if isinstance(need, dict) else need
+                    if needed_job not in jobs:
+                        return False
+            
             return True
             
         except yaml.YAMLError:
@@ -75,10 +104,83 @@ class GitLabGenerator(BaseGenerator):
         except Exception:
             return False
     
+    def build_job_graph(self, analysis: ProjectAnalysis) -> Dict[str, List[str]]:
+        """Строит граф заданий (задание -> needs) и проверяет, что он ацикличен"""
+        job_graph = {job: list(needs) for job, _, needs in PIPELINE_JOBS}
+        
+        visited, in_progress = set(), set()
+        
+        def visit(job: str):
+            if job in in_progress:
+                raise ValueError(f"Цикл в графе заданий GitLab CI: {job}")
+            if job in visited:
+                return
+            if job not in job_graph:
+                raise ValueError(f"Неизвестное задание в графе GitLab CI: {job}")
+            in_progress.add(job)
+            for needed_job in job_graph[job]:
+                visit(needed_job)
+            in_progress.discard(job)
+            visited.add(job)
+        
+        for job in job_graph:
+            visit(job)
+        return job_graph
+    
+    def get_stages(self) -> List[str]:
+        """Возвращает стадии пайплайна в порядке выполнения"""
+        stages = []
+        for _, stage, _ in PIPELINE_JOBS:
+            if stage not in stages:
+                stages.append(stage)
+        return stages
+    
     def get_output_filename(self, analysis: ProjectAnalysis) -> str:
         """Возвращает имя выходного файла для GitLab CI"""
         return ".gitlab-ci.yml"
     
+    def get_component_output_filename(self, analysis: ProjectAnalysis) -> str:
+        """Дочерняя конфигурация компонента, запускаемая из родительского .gitlab-ci.yml"""
+        slug = analysis.component_path.replace("/", "-") if analysis.component_path else analysis.repo_name
+        return f"{COMPONENTS_CONFIG_DIR}/{slug}.yml"
+    
+    def generate_components(self, analyses: List[ProjectAnalysis], output_dir: str) -> List[CICDConfig]:
+        """Генерирует дочерние конфигурации компонентов и родительский .gitlab-ci.yml с trigger-заданиями"""
+        configs = super().generate_components(analyses, output_dir)
+        
+        components = [
+            {
+                "job_name": analysis.repo_name,
+                "component_path": analysis.component_path,
+                "language": analysis.language,
+                "config_path": self.get_component_output_filename(analysis),
+                "changes": self._get_change_patterns(analysis),
+            }
+            for analysis in analyses
+        ]
+        variables = {"components": components}
+        config_content = self.render_template("monorepo.j2", variables)
+        self.save_config(config_content, str(Path(output_dir) / ".gitlab-ci.yml"))
+        
+        configs.append(CICDConfig(
+            system="gitlab",
+            template_name="monorepo.j2",
+            variables=variables,
+            stages=["components"],
+            config_content=config_content,
+            job_graph={component["job_name"]: [] for component in components}
+        ))
+        return configs
+    
+    def _get_change_patterns(self, analysis: ProjectAnalysis) -> List[str]:
+        """Шаблоны rules:changes для trigger-задания компонента (пустой список - без фильтра)"""
+        if not analysis.change_paths:
+            return []
+        patterns = [f"{path}**/*" if path.endswith("/") else path for path in analysis.change_paths]
+        # Изменение собственной конфигурации компонента тоже должно запускать его пайплайн
+        patterns.append(self.get_component_output_filename(analysis))
+        return patterns
+    
     def _get_template_name(self, analysis: ProjectAnalysis) -> str:
         """Определяет имя шаблона на основе языка проекта"""
         language_to_template = {
@@ -94,18 +196,23 @@ class GitLabGenerator(BaseGenerator):
         
         return template_name
     
-    def get_template_variables(self, analysis: ProjectAnalysis) -> Dict[str, Any]:
+    def get_template_variables(self, analysis: ProjectAnalysis,
+                               shared_variables: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Расширяет базовые переменные для GitLab CI"""
-        variables = super().get_template_variables(analysis)
+        variables = super().get_template_variables(analysis, shared_variables)
         
         # Добавляем специфичные для GitLab CI переменные
         gitlab_variables = {
-            "docker_registry": os.getenv("DOCKER_REGISTRY", "registry.example.com"),
-            "nexus_url": os.getenv("NEXUS_URL", "http://nexus:8081"),
-            "sonar_url": os.getenv("SONAR_URL", "http://sonarqube:9000"),
-            "k8s_namespace": os.getenv("K8S_NAMESPACE", "default"),
-            "ci_registry": os.getenv("CI_REGISTRY", "registry.gitlab.com")
+            "job_graph": self.build_job_graph(analysis),
+            "dependency_cache": self.get_dependency_cache_variables(analysis, "$CI_PROJECT_DIR")
         }
         
+        # Модульные тесты разбиваются через parallel: N, номер шарда - $CI_NODE_INDEX
+        test_shards = choose_shard_count(analysis, self.test_shards)
+        gitlab_variables["test_shards"] = test_shards
+        gitlab_variables["unit_test_shard_command"] = (
+            shard_command(analysis, "$CI_NODE_INDEX", "$CI_NODE_TOTAL") if test_shards else None
+        )
+        
         variables.update(gitlab_variables)
         return variables
\ No newline at end of file
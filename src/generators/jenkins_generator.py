@@ -1,39 +1,52 @@
-import os
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Union
 import re
 from .base_generator import BaseGenerator
+from .test_sharding import choose_shard_count, shard_command
 from ..analyzers.models import ProjectAnalysis, CICDConfig
 
 
+# Стадии пайплайна: (стадия, название в Jenkins, стадии, результаты которых ей нужны).
+# Стадии без взаимных зависимостей выполняются в одном блоке parallel.
+PIPELINE_STAGES = [
+    ("build", "Build", []),
+    ("unit_tests", "Unit Tests", ["build"]),
+    ("integration_tests", "Integration Tests", ["build"]),
+    ("code_analysis", "Code Analysis", ["build"]),
+    ("docker_build", "Docker Build", ["build"]),
+    ("publish", "Publish Artifacts", ["build", "unit_tests", "integration_tests", "code_analysis", "docker_build"]),
+    ("deploy_staging", "Deploy to Staging", ["publish"]),
+    ("deploy_production", "Deploy to Production", ["publish"]),
+]
+
+
 class JenkinsGenerator(BaseGenerator):
     """Генератор конфигураций для Jenkins"""
     
-    def __init__(self):
+    def __init__(self, test_shards: Optional[Union[int, str]] = None):
         template_dir = str(Path(__file__).parent.parent / "templates" / "jenkins")
-        super().__init__(template_dir, "jenkins")
+        super().__init__(template_dir, "jenkins", test_shards)
     
-    def generate(self, analysis: ProjectAnalysis, output_path: str) -> CICDConfig:
-        """Генерирует Jenkinsfile на основе анализа проекта"""
+    def render(self, analysis: ProjectAnalysis, shared_variables: Optional[Dict[str, Any]] = None) -> CICDConfig:
+        """Рендерит Jenkinsfile на основе анализа проекта"""
         # Определяем имя шаблона на основе языка
         template_name = self._get_template_name(analysis)
         
         # Получаем переменные для шаблона
-        variables = self.get_template_variables(analysis)
+        variables = self.get_template_variables(analysis, shared_variables)
         
         # Рендерим шаблон
         config_content = self.render_template(template_name, variables)
         
-        # Сохраняем конфигурационный файл
-        final_output_path = self.save_config(config_content, output_path)
-        
         # Создаем объект конфигурации
+        stage_graph = self.build_stage_graph(analysis)
         config = CICDConfig(
             system="jenkins",
             template_name=template_name,
             variables=variables,
-            stages=["build", "test", "code_analysis", "docker_build", "publish", "deploy_staging", "deploy_production"],
-            config_content=config_content
+            stages=list(stage_graph),
+            config_content=config_content,
+            job_graph=stage_graph
         )
         
         return config
@@ -54,10 +67,78 @@ class JenkinsGenerator(BaseGenerator):
         
         return True
     
+    def build_stage_graph(self, analysis: ProjectAnalysis) -> Dict[str, List[str]]:
+        """Возвращает граф зависимостей стадий (стадия -> стадии, от которых она зависит)
+        
+        При разбиении тестов стадия unit_tests заменяется шардами unit_tests_1..N.
+        """
+        shards = self._get_unit_test_shards(analysis)
+        stage_graph = {}
+        for stage, _, needs in PIPELINE_STAGES:
+            needs = [shard for needed in needs for shard in shards.get(needed, [needed])]
+            for shard in shards.get(stage, [stage]):
+                stage_graph[shard] = needs
+        return stage_graph
+    
+    def _get_unit_test_shards(self, analysis: ProjectAnalysis) -> Dict[str, List[str]]:
+        """Возвращает замену стадии модульных тестов шардами (пусто - без разбиения)"""
+        test_shards = choose_shard_count(analysis, self.test_shards)
+        if not test_shards:
+            return {}
+        return {"unit_tests": [f"unit_tests_{index}" for index in range(1, test_shards + 1)]}
+    
+    def build_stage_groups(self, analysis: ProjectAnalysis) -> List[Dict[str, Any]]:
+        """Раскладывает граф стадий по уровням: стадии одного уровня не зависят друг от друга
+        
+        Уровень стадии на единицу больше максимального уровня ее зависимостей;
+        уровень из нескольких стадий выводится как блок parallel.
+        """
+        stage_graph = self.build_stage_graph(analysis)
+        # Стадия графа -> (стадия шаблона, номер шарда или None)
+        templates = {stage: (stage, None) for stage, _, _ in PIPELINE_STAGES}
+        for stage, shards in self._get_unit_test_shards(analysis).items():
+            templates.update({shard: (stage, index) for index, shard in enumerate(shards, 1)})
+        titles = {stage: title for stage, title, _ in PIPELINE_STAGES}
+        levels: Dict[str, int] = {}
+        
+        def level_of(stage: str, path: tuple = ()) -> int:
+            if stage in path:
+                raise ValueError(f"Цикл в графе стадий Jenkins: {stage}")
+            if stage not in stage_graph:
+                raise ValueError(f"Неизвестная стадия в графе Jenkins: {stage}")
+            if stage not in levels:
+                levels[stage] = 1 + max((level_of(needed, path + (stage,)) for needed in stage_graph[stage]), default=-1)
+            return levels[stage]
+        
+        groups: List[List[str]] = []
+        for stage in stage_graph:
+            level = level_of(stage)
+            while len(groups) <= level:
+                groups.append([])
+            groups[level].append(stage)
+        
+        def title_of(stage: str) -> str:
+            template, shard = templates[stage]
+            return f"{titles[template]} {shard}/{len(self._get_unit_test_shards(analysis)[template])}" if shard else titles[template]
+        
+        return [
+            {
+                "name": ", ".join(title_of(stage) for stage in group),
+                "stages": [{"key": stage, "macro": templates[stage][0], "shard": templates[stage][1]} for stage in group],
+            }
+            for group in groups if group
+        ]
+    
     def get_output_filename(self, analysis: ProjectAnalysis) -> str:
         """Возвращает имя выходного файла для Jenkins"""
         return "Jenkinsfile"
     
+    def get_component_output_filename(self, analysis: ProjectAnalysis) -> str:
+        """Jenkinsfile в директории компонента (Script Path задания Jenkins указывает на него)"""
+        if analysis.component_path:
+            return f"{analysis.component_path}/Jenkinsfile"
+        return "Jenkinsfile"
+    
     def _get_template_name(self, analysis: ProjectAnalysis) -> str:
         """Определяет имя шаблона на основе языка проекта"""
         language_to_template = {
@@ -73,17 +154,30 @@ class JenkinsGenerator(BaseGenerator):
         
         return template_name
     
-    def get_template_variables(self, analysis: ProjectAnalysis) -> Dict[str, Any]:
+    def get_template_variables(self, analysis: ProjectAnalysis,
+                               shared_variables: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Расширяет базовые переменные для Jenkins"""
-        variables = super().get_template_variables(analysis)
+        variables = super().get_template_variables(analysis, shared_variables)
         
         # Добавляем специфичные для Jenkins переменные
         jenkins_variables = {
-            "docker_registry": os.getenv("DOCKER_REGISTRY", "registry.example.com"),
-            "nexus_url": os.getenv("NEXUS_URL", "http://nexus:8081"),
-            "sonar_url": os.getenv("SONAR_URL", "http://sonarqube:9000"),
-            "k8s_namespace": os.getenv("K8S_NAMESPACE", "default")
+            # Стадии компонента монорепозитория выполняются только при изменениях в его путях
+            "stage_groups": self.build_stage_groups(analysis),
+            # Номер шарда - в $SHARD_INDEX, отчеты раздельные: шарды Python, Go и JS делят рабочую копию
+            "test_shards": choose_shard_count(analysis, self.test_shards),
+            "unit_test_shard_command": _groovy_escape(
+                shard_command(analysis, "$SHARD_INDEX", "$SHARD_TOTAL", report_suffix="-$SHARD_INDEX") or ""
+            ),
+            "dependency_cache": self.get_dependency_cache_variables(analysis, "${env.WORKSPACE}"),
+            "changeset_patterns": [
+                _groovy_escape(f"{path}**" if path.endswith("/") else path) for path in analysis.change_paths
+            ]
         }
         
         variables.update(jenkins_variables)
-        return variables
\ No newline at end of file
+        return variables
+
+
+def _groovy_escape(value: str) -> str:
+    """Экранирует строку для вставки в одинарные кавычки Groovy"""
+    return value.replace("\\", "\\\\").replace("'", "\\'")
@@ -0,0 +1,78 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+from .base_generator import BaseGenerator, stage_file
+from ..analyzers.models import ProjectAnalysis, CICDConfig
+from ..utils.profiling import span
+
+
+@dataclass
+class GenerationResult:
+    """Конфигурация одной системы, полученная конвейером генерации"""
+    system: str
+    output_path: str
+    config: CICDConfig
+    valid: bool
+    render_seconds: float  # рендер и валидация
+
+
+class GenerationPipeline:
+    """Генерация конфигураций для нескольких систем за один проход
+
+    Общий контекст шаблонов вычисляется один раз на анализ, системы рендерятся и валидируются
+    параллельно, а файлы записываются только после успешного рендера всех систем.
+    """
+
+    def __init__(self, generators: List[BaseGenerator], max_workers: Optional[int] = None):
+        if not generators:
+            raise ValueError("Не задано ни одного генератора")
+        self.generators = generators
+        self.max_workers = max_workers or len(generators)
+
+    def run(self, analysis: ProjectAnalysis, output_dir: str) -> List[GenerationResult]:
+        """Рендерит конфигурации всех систем и записывает их в output_dir"""
+        results = self.render_all(analysis, output_dir)
+        self.write_all(results)
+        return results
+
+    def render_all(self, analysis: ProjectAnalysis, output_dir: str) -> List[GenerationResult]:
+        """Рендерит и валидирует конфигурации всех систем, ничего не записывая"""
+        shared_variables = self.generators[0].get_shared_variables(analysis)
+
+        def render_one(generator: BaseGenerator) -> GenerationResult:
+            started = time.perf_counter()
+            config = generator.render(analysis, shared_variables)
+            with span(f"validate.{generator.system_name}"):
+                valid = generator.validate(config.config_content)
+            return GenerationResult(
+                system=generator.system_name,
+                output_path=str(Path(output_dir) / generator.get_output_filename(analysis)),
+                config=config,
+                valid=valid,
+                render_seconds=time.perf_counter() - started
+            )
+
+        if len(self.generators) == 1:
+            return [render_one(self.generators[0])]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(render_one, self.generators))
+
+    def write_all(self, results: List[GenerationResult]):
+        """Записывает конфигурации: сначала во временные файлы, затем подменяет все разом
+
+        Если запись любого файла не удалась, ни один выходной файл не изменяется.
+        """
+        staged = []
+        try:
+            for result in results:
+                staged.append((stage_file(result.config.config_content, result.output_path), result.output_path))
+        except BaseException:
+            for tmp_path, _ in staged:
+                os.unlink(tmp_path)
+            raise
+
+        for tmp_path, output_path in staged:
+            os.replace(tmp_path, output_path)
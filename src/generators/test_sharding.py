@@ -0,0 +1,101 @@
+import math
+from typing import List, Optional, Union
+from ..analyzers.models import ProjectAnalysis
+from ..analyzers.detectors.java_detector import JavaDetector
+from ..analyzers.detectors.python_detector import PythonDetector
+
+
+# Сколько тестовых файлов (для Go - пакетов) приходится на один шард в автоматическом режиме
+FILES_PER_SHARD = 25
+MAX_SHARDS = 8
+
+# Выбор своей доли списка: строки распределяются по шардам по кругу, номер шарда с 1
+_SHARD_FILTER = "awk -v shard={index} -v shards={total} '(NR - 1) % shards == shard - 1'"
+
+_PYTHON_RUNNERS = {"poetry": "poetry run ", "pipenv": "pipenv run "}
+
+# Где команды шардов ищут тесты: модульные тесты Python и тестовые исходники Maven/Gradle
+PYTHON_UNIT_TEST_DIR = "tests/unit"
+JAVA_TEST_DIR = "src/test"
+
+
+def _find_names(patterns: List[str]) -> str:
+    """Условие find по шаблонам имен тестов детектора: шарды запускают те же файлы, что посчитаны"""
+    return "\\( " + " -o ".join(f"-name '{pattern}'" for pattern in patterns) + " \\)"
+
+
+def shardable_test_files(analysis: ProjectAnalysis) -> List[str]:
+    """Тестовые файлы, которые может выбрать команда шарда (те же каталоги, что в find)"""
+    if analysis.language == "python":
+        return [path for path in analysis.test_files if path.startswith(f"{PYTHON_UNIT_TEST_DIR}/")]
+    if analysis.language == "java":
+        return [path for path in analysis.test_files if f"/{JAVA_TEST_DIR}/" in f"/{path}"]
+    return list(analysis.test_files)
+
+
+def count_test_units(analysis: ProjectAnalysis) -> int:
+    """Число единиц распределения тестов: файлы, а для Go - пакеты с тестами"""
+    test_files = shardable_test_files(analysis)
+    if analysis.language == "go":
+        return len({path.rpartition("/")[0] for path in test_files})
+    return len(test_files)
+
+
+def choose_shard_count(analysis: ProjectAnalysis, requested: Optional[Union[int, str]]) -> int:
+    """Возвращает число шардов модульных тестов (0 - без разбиения)
+
+    requested: None - разбиение выключено, "auto" - по числу найденных тестов, число - явное значение.
+    Шардов не больше, чем тестовых единиц, доступных командам шардов: пустой шард не нужен.
+    """
+    if requested is None or shard_command(analysis, "1", "1") is None:
+        return 0
+
+    units = count_test_units(analysis)
+    if requested == "auto":
+        shards = min(MAX_SHARDS, math.ceil(units / FILES_PER_SHARD))
+    else:
+        shards = min(int(requested), units)
+    return shards if shards > 1 else 0
+
+
+def shard_command(analysis: ProjectAnalysis, index: str, total: str, report_suffix: str = "") -> Optional[str]:
+    """Shell-команда запуска своей доли модульных тестов
+
+    index и total - выражения shell с номером шарда (с 1) и числом шардов;
+    report_suffix добавляется к имени JUnit-отчета, если шарды делят рабочую копию.
+    Возвращает None, если для стека проекта разбиение не поддерживается.
+    """
+    shard_filter = _SHARD_FILTER.format(index=index, total=total)
+    build_tool = analysis.build_tool
+
+    if analysis.language == "python":
+        runner = _PYTHON_RUNNERS.get(build_tool, "")
+        return (
+            f"FILES=$(find {PYTHON_UNIT_TEST_DIR} -type f {_find_names(PythonDetector.test_patterns)} | sort | {shard_filter}); "
+            f"if [ -n \"$FILES\" ]; then {runner}pytest $FILES -v --junitxml=test-results/unit{report_suffix}.xml; fi"
+        )
+    if analysis.language == "java" and build_tool == "maven":
+        return (
+            f"CLASSES=$(find . -path '*/{JAVA_TEST_DIR}/*' {_find_names(JavaDetector.test_patterns)} | sort | {shard_filter}"
+            f" | xargs -r -n1 basename | sed 's/\\.[a-z]*$//' | paste -sd, -); "
+            f"if [ -n \"$CLASSES\" ]; then mvn test -Dtest=\"$CLASSES\" -Dsurefire.failIfNoSpecifiedTests=false; fi"
+        )
+    if analysis.language == "java" and build_tool == "gradle":
+        return (
+            f"FILTERS=$(find . -path '*/{JAVA_TEST_DIR}/*' {_find_names(JavaDetector.test_patterns)} | sort | {shard_filter}"
+            f" | xargs -r -n1 basename | sed 's/\\.[a-z]*$//; s/^/--tests /'); "
+            f"if [ -n \"$FILTERS\" ]; then gradle test $FILTERS; fi"
+        )
+    if analysis.language == "go":
+        return (
+            f"PKGS=$(go list ./... | sort | {shard_filter}); "
+            f"if [ -n \"$PKGS\" ]; then go test -v -short $PKGS; fi"
+        )
+    if analysis.language == "javascript":
+        # Jest (28+) разбивает набор тестов сам
+        if build_tool == "yarn":
+            return f"yarn test:unit --shard={index}/{total}"
+        if build_tool == "pnpm":
+            return f"pnpm test:unit --shard={index}/{total}"
+        return f"npm run test:unit -- --shard={index}/{total}"
+    return None
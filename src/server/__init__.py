@@ -0,0 +1,4 @@
+# Локальный HTTP-сервис анализа и генерации
+from .app import AnalysisServer, DEFAULT_HOST, DEFAULT_PORT
+
+__all__ = ['AnalysisServer', 'DEFAULT_HOST', 'DEFAULT_PORT']
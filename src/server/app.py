@@ -0,0 +1,248 @@
+import asyncio
+import ipaddress
+import json
+import time
+from collections import OrderedDict
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional, Tuple
+from ..analyzers import RepositoryAnalyzer, ProjectAnalysis
+from ..generators import BaseGenerator, GenerationPipeline
+from ..utils.git_utils import validate_git_url
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_BODY_BYTES = 64 * 1024
+# Анализ в памяти считается свежим столько секунд; дальше - проверка HEAD через дисковый кеш анализатора
+ANALYSIS_TTL = 60.0
+MAX_MEMORY_ANALYSES = 256
+
+_STATUS_TEXT = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable",
+}
+
+
+class HTTPError(Exception):
+    """Ошибка запроса, возвращаемая клиенту с кодом статуса"""
+
+    def __init__(self, status: int, message: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+class AnalysisServer:
+    """Локальный HTTP-сервис анализа и генерации с прогретыми анализатором и генераторами
+
+    Анализы выполняются воркерами из ограниченной очереди: не больше workers клонирований
+    одновременно и не больше max_pending ожидающих задач, сверх этого - 503 с Retry-After.
+    Одновременные запросы одного репозитория обслуживаются одним анализом.
+    """
+
+    def __init__(self, analyzer: RepositoryAnalyzer, generators: List[BaseGenerator],
+                 workers: int = 2, max_pending: int = 16):
+        self.analyzer = analyzer
+        self.generators = {generator.system_name: generator for generator in generators}
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self._queue: Optional[asyncio.Queue] = None
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._recent: "OrderedDict[str, Tuple[float, ProjectAnalysis]]" = OrderedDict()
+        self._active = 0
+
+    async def serve(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        """Запускает сервер и обслуживает запросы до отмены"""
+        if not _is_local_host(host):
+            raise ValueError(f"Сервис слушает только локальные адреса: {host}")
+
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        worker_tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        server = await asyncio.start_server(self._handle_connection, host, port)
+        print(f"🚀 Сервис Self-Deploy слушает http://{host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for task in worker_tasks:
+                task.cancel()
+
+    async def analyze(self, repo_url: str) -> ProjectAnalysis:
+        """Возвращает анализ репозитория: из памяти, из текущего анализа того же URL или через очередь"""
+        recent = self._recent.get(repo_url)
+        if recent is not None and time.monotonic() - recent[0] < ANALYSIS_TTL:
+            self._recent.move_to_end(repo_url)
+            return recent[1]
+
+        future = self._in_flight.get(repo_url)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            try:
+                self._queue.put_nowait((repo_url, future))
+            except asyncio.QueueFull:
+                raise HTTPError(503, "Очередь анализа заполнена, повторите позже", {"Retry-After": "5"})
+            self._in_flight[repo_url] = future
+        # shield: отключение одного клиента не отменяет анализ для остальных
+        return await asyncio.shield(future)
+
+    async def generate(self, repo_url: str, systems: List[str]) -> Dict[str, Any]:
+        """Анализирует репозиторий и рендерит конфигурации выбранных систем без записи на диск"""
+        unknown = [system for system in systems if system not in self.generators]
+        if unknown:
+            raise HTTPError(400, f"Неподдерживаемые системы: {', '.join(unknown)}")
+
+        analysis = await self.analyze(repo_url)
+        pipeline = GenerationPipeline([self.generators[system] for system in systems])
+        results = await asyncio.get_running_loop().run_in_executor(None, pipeline.render_all, analysis, "")
+        return {
+            "analysis": asdict(analysis),
+            "configs": [
+                {
+                    "system": result.system,
+                    "filename": result.output_path,
+                    "valid": result.valid,
+                    "render_seconds": round(result.render_seconds, 4),
+                    "content": result.config.config_content,
+                }
+                for result in results
+            ],
+        }
+
+    async def _worker(self):
+        """Берет задачи из очереди и выполняет блокирующий анализ в пуле потоков"""
+        loop = asyncio.get_running_loop()
+        while True:
+            repo_url, future = await self._queue.get()
+            self._active += 1
+            try:
+                analysis = await loop.run_in_executor(None, self.analyzer.analyze_project, repo_url)
+                self._remember(repo_url, analysis)
+                future.set_result(analysis)
+            except Exception as e:
+                future.set_exception(HTTPError(500, f"Ошибка анализа: {e}"))
+            finally:
+                self._active -= 1
+                self._in_flight.pop(repo_url, None)
+                self._queue.task_done()
+
+    def _remember(self, repo_url: str, analysis: ProjectAnalysis):
+        self._recent[repo_url] = (time.monotonic(), analysis)
+        self._recent.move_to_end(repo_url)
+        while len(self._recent) > MAX_MEMORY_ANALYSES:
+            self._recent.popitem(last=False)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        status, headers, payload = 200, {}, None
+        try:
+            method, path, body = await _read_request(reader)
+            payload = await self._dispatch(method, path, body)
+        except HTTPError as e:
+            status, headers, payload = e.status, e.headers, {"error": str(e)}
+        except Exception as e:
+            status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+
+        try:
+            writer.write(_format_response(status, payload, headers))
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method: str, path: str, body: bytes) -> Dict[str, Any]:
+        routes = {"/health": "GET", "/analyze": "POST", "/generate": "POST"}
+        if path not in routes:
+            raise HTTPError(404, f"Неизвестный путь: {path}")
+        if method != routes[path]:
+            raise HTTPError(405, f"Метод {method} не поддерживается для {path}")
+
+        if path == "/health":
+            return {
+                "status": "ok",
+                "active": self._active,
+                "pending": self._queue.qsize(),
+                "capacity": self.max_pending,
+                "systems": sorted(self.generators),
+            }
+
+        request = _parse_json(body)
+        repo_url = request.get("repo")
+        if not isinstance(repo_url, str) or not validate_git_url(repo_url):
+            raise HTTPError(400, f"Некорректный URL Git-репозитория: {repo_url}")
+
+        if path == "/analyze":
+            return asdict(await self.analyze(repo_url))
+
+        systems = request.get("systems") or sorted(self.generators)
+        if isinstance(systems, str):
+            systems = [systems]
+        if not isinstance(systems, list) or not all(isinstance(system, str) for system in systems):
+            raise HTTPError(400, "Поле systems должно быть строкой или списком строк")
+        return await self.generate(repo_url, systems)
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Tuple[str, str, bytes]:
+    """Читает HTTP/1.1 запрос: метод, путь без query string и тело"""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError:
+        raise HTTPError(400, "Неполный запрос")
+    except asyncio.LimitOverrunError:
+        raise HTTPError(413, "Слишком длинные заголовки")
+
+    lines = head.decode("latin-1").split("\r\n")
+    parts = lines[0].split()
+    if len(parts) != 3:
+        raise HTTPError(400, "Некорректная строка запроса")
+    method, target, _ = parts
+
+    headers = {}
+    for line in lines[1:]:
+        name, sep, value = line.partition(":")
+        if sep:
+            headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length", "0"))
+    except ValueError:
+        raise HTTPError(400, "Некорректный Content-Length")
+    if length < 0:
+        raise HTTPError(400, "Некорректный Content-Length")
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(413, f"Тело запроса больше {MAX_BODY_BYTES} байт")
+    try:
+        body = await reader.readexactly(length) if length else b""
+    except asyncio.IncompleteReadError:
+        raise HTTPError(400, "Тело запроса короче Content-Length")
+    return method.upper(), target.split("?", 1)[0], body
+
+
+def _parse_json(body: bytes) -> Dict[str, Any]:
+    try:
+        request = json.loads(body.decode("utf-8") or "{}")
+    except (UnicodeDecodeError, ValueError) as e:
+        raise HTTPError(400, f"Некорректный JSON: {e}")
+    if not isinstance(request, dict):
+        raise HTTPError(400, "Ожидается JSON-объект")
+    return request
+
+
+def _format_response(status: int, payload: Any, headers: Dict[str, str]) -> bytes:
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    lines = [
+        f"HTTP/1.1 {status} {_STATUS_TEXT.get(status, 'Error')}",
+        "Content-Type: application/json; charset=utf-8",
+        f"Content-Length: {len(body)}",
+        "Connection: close",
+    ]
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+
+def _is_local_host(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
@@ -1,7 +1,7 @@
 # Вспомогательные утилиты
 from .git_utils import clone_repository, get_repo_name_from_url, validate_git_url
 from .file_utils import find_files_by_pattern, read_file_safe, create_temp_directory
-from .reporting import print_summary, print_error_summary, print_technology_detection, print_configuration_preview, print_comparison_table, print_file_structure, print_recommendations, print_success_message
+from .reporting import print_summary, print_error_summary, print_technology_detection, print_configuration_preview, print_comparison_table, print_file_structure, print_recommendations, print_success_message, print_batch_summary, print_profile
 
 __all__ = [
     'clone_repository',
@@ -17,5 +17,7 @@ __all__ = [
     'print_comparison_table',
     'print_file_structure',
     'print_recommendations',
-    'print_success_message'
+    'print_success_message',
+    'print_batch_summary',
+    'print_profile'
 ]
\ No newline at end of file
@@ -0,0 +1,121 @@
+"""
+Замеры времени по фазам запуска (--profile)
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, Iterator, List, Optional
+
+
+@dataclass
+class Span:
+    """Один замер: фаза, ее длительность и счетчики, накопленные внутри нее"""
+    name: str
+    start: float  # секунды от начала профилирования
+    duration: float = 0.0
+    thread: str = ""
+    attrs: Dict[str, Any] = field(default_factory=dict)
+    counters: Dict[str, int] = field(default_factory=dict)
+
+
+class Profiler:
+    """Собирает замеры из всех потоков процесса
+
+    Счетчики (прочитанные файлы, байты) относятся к самому вложенному открытому замеру
+    текущего потока, поэтому чтения детектора попадают в его замер и при параллельных детекторах.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @contextmanager
+    def span(self, name: str, **attrs) -> Iterator[Span]:
+        current = Span(name=name, start=time.perf_counter() - self.started,
+                       thread=threading.current_thread().name, attrs=attrs)
+        stack = self._stack()
+        stack.append(current)
+        try:
+            yield current
+        finally:
+            stack.pop()
+            current.duration = time.perf_counter() - self.started - current.start
+            with self._lock:
+                self.spans.append(current)
+
+    def add(self, counter: str, value: int = 1):
+        """Увеличивает счетчик текущего замера потока (вне замеров счетчик не учитывается)"""
+        stack = self._stack()
+        if stack:
+            counters = stack[-1].counters
+            counters[counter] = counters.get(counter, 0) + value
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Агрегаты по фазам в порядке первого появления: вызовы, суммарное и максимальное время, счетчики"""
+        phases: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span.start)
+        for span in spans:
+            phase = phases.setdefault(span.name, {"name": span.name, "calls": 0, "total": 0.0, "max": 0.0,
+                                                  "counters": {}})
+            phase["calls"] += 1
+            phase["total"] += span.duration
+            phase["max"] = max(phase["max"], span.duration)
+            for counter, value in span.counters.items():
+                phase["counters"][counter] = phase["counters"].get(counter, 0) + value
+        return list(phases.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span.start)
+        return {
+            "total": time.perf_counter() - self.started,
+            "phases": self.summary(),
+            "spans": [asdict(span) for span in spans],
+        }
+
+    def write_json(self, path: str) -> str:
+        """Сохраняет замеры в JSON для внешних дашбордов"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        return path
+
+    def _stack(self) -> List[Span]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+
+# Активный профилировщик процесса; None - профилирование выключено и замеры ничего не стоят
+_profiler: Optional[Profiler] = None
+
+
+def enable_profiling() -> Profiler:
+    """Включает профилирование для процесса и возвращает профилировщик"""
+    global _profiler
+    _profiler = Profiler()
+    return _profiler
+
+
+def get_profiler() -> Optional[Profiler]:
+    return _profiler
+
+
+def span(name: str, **attrs):
+    """Замер фазы: контекстный менеджер, при выключенном профилировании - пустой"""
+    if _profiler is None:
+        return nullcontext()
+    return _profiler.span(name, **attrs)
+
+
+def add_counter(counter: str, value: int = 1):
+    if _profiler is not None:
+        _profiler.add(counter, value)
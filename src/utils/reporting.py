@@ -25,6 +25,9 @@ def print_summary(analysis, generated_config: str, output_path: str) -> None:
     if hasattr(analysis, 'dependency_managers') and analysis.dependency_managers:
         print(f"   Системы управления зависимостями: {', '.join(analysis.dependency_managers)}")
     
+    if getattr(analysis, 'pruned_dirs', 0):
+        print(f"   Пропущено директорий при обходе: {analysis.pruned_dirs}")
+    
     print(f"\n📁 Сгенерированная конфигурация сохранена в: {output_path}")
     
     # Выводим статистику конфигурации
@@ -167,4 +170,42 @@ def print_success_message(output_files: list) -> None:
             file_size = Path(file_path).stat().st_size
             print(f"   ✅ {file_path} ({file_size} байт)")
         else:
-            print(f"   ❌ {file_path} (файл не найден)")
\ No newline at end of file
+            print(f"   ❌ {file_path} (файл не найден)")
+
+
+def print_batch_summary(results: list, summary_path: str) -> None:
+    """Выводит итоги пакетной обработки репозиториев"""
+    succeeded = [result for result in results if result.status == 'ok']
+    failed = [result for result in results if result.status != 'ok']
+    total_time = sum(result.timings.get('total', 0.0) for result in results)
+    
+    print("\n📦 ИТОГИ ПАКЕТНОЙ ОБРАБОТКИ:")
+    print(f"   Всего репозиториев: {len(results)}")
+    print(f"   Успешно: {len(succeeded)}")
+    print(f"   С ошибками: {len(failed)}")
+    if results:
+        print(f"   Среднее время на репозиторий: {total_time / len(results):.2f} с")
+    
+    for result in failed:
+        print(f"   ❌ {result.name}: {result.error}")
+    
+    print(f"\n📄 Сводка сохранена в: {summary_path}")
+
+
+def print_profile(profile: Dict[str, Any], json_path: str = None) -> None:
+    """Выводит таблицу замеров по фазам (Profiler.to_dict())"""
+    print(f"\n⏱️  ПРОФИЛЬ ЗАПУСКА (всего {profile['total']:.3f} с):")
+    print("+" + "-"*86 + "+")
+    print(f"| {'Фаза':<26} | {'Вызовов':>7} | {'Всего, мс':>10} | {'Макс, мс':>9} | {'Файлов':>8} | {'Прочитано, Б':>12} |")
+    print("+" + "-"*86 + "+")
+    for phase in profile['phases']:
+        counters = phase['counters']
+        files = counters.get('files_walked', counters.get('files_read', 0))
+        print(f"| {phase['name'][:26]:<26} | {phase['calls']:>7} | {phase['total'] * 1000:>10.1f} | "
+              f"{phase['max'] * 1000:>9.1f} | {files or '':>8} | {counters.get('bytes_read', '') :>12} |")
+    print("+" + "-"*86 + "+")
+    print("   Файлов: обойдено при построении индекса или прочитано детектором")
+    
+    if json_path:
+        print(f"\n📄 Профиль в JSON сохранен в: {json_path}")
+